@@ -1,5 +1,7 @@
+import io
 import os
 import re
+from collections import Counter, defaultdict
 from typing import Dict
 from anthropic import Anthropic
 from anthropic.types import TextBlock
@@ -8,6 +10,66 @@ from dotenv import load_dotenv
 # Load environment variables - simple approach
 load_dotenv()
 
+# Matches the channels of computed-style colors such as rgb(12, 34, 56) / rgba(12, 34, 56, 0.5)
+_RGB_RE = re.compile(r'rgba?\(\s*(\d+)[,\s]+(\d+)[,\s]+(\d+)')
+
+
+def _rgb_bucket(color: str):
+    """Quantize an rgb()/rgba() color to one of 512 buckets (3 bits per channel).
+
+    Anti-aliased near-duplicates land in the same bucket; anything that is not
+    an rgb() value is returned unchanged so it still counts as its own bucket.
+    """
+    match = _RGB_RE.match(color)
+    if not match:
+        return color
+    r, g, b = (min(int(channel), 255) for channel in match.groups())
+    return ((r >> 5) << 6) | ((g >> 5) << 3) | (b >> 5)
+
+
+# Any of these in the LLM output means _clean_html_output has notes to strip
+_NOTE_MARKERS_RE = re.compile(
+    r"note:|due to length limits|i've shown|complete implementation|would include all|"
+    r"following the exact same pattern|maintaining consistent|for brevity|remaining items|"
+    r"continuing with all|items following|<!-- remaining",
+    re.IGNORECASE
+)
+
+# Leftover single-line bracketed notes; the [^\]\n] class keeps the scan linear on long outputs
+_BRACKETED_NOTE_RE = re.compile(
+    r'\[[^\]\n]*(?:implementation|pattern|styling|brevity|length)[^\]\n]*\]',
+    re.IGNORECASE
+)
+
+
+# Static closing block of the design requirements; joined once at import time
+_MODERN_DESIGN_REQUIREMENTS = "\n".join((
+    "MODERN INTERACTIVE DESIGN REQUIREMENTS:",
+    "- Use CSS transitions for smooth hover effects (0.3s ease-in-out)",
+    "- Add subtle box-shadows and elevate elements on hover",
+    "- Implement proper button states: default, hover, active, focus",
+    "- Use modern CSS features: flexbox, grid, css variables",
+    "- Include smooth scrolling and proper spacing (use rem/em units)",
+    "- Add loading states and micro-interactions where appropriate",
+    "- Ensure all interactive elements have visual feedback",
+    "- Use consistent border-radius (Apple uses 8px-12px typically)",
+    "- Include proper typography scale and consistent spacing system",
+    "",
+    "NAVIGATION BAR SPECIFIC REQUIREMENTS:",
+    "- Create a proper flexbox navigation layout with three sections:",
+    "  1. Logo on the LEFT (flex-shrink: 0)",
+    "  2. Navigation menu in the CENTER (display: flex, gap: 20px)",
+    "  3. Additional items on the RIGHT (if any)",
+    "- Use justify-content: space-between on the main nav container",
+    "- Ensure logo img has proper constraints: max-height: 32px, width: auto",
+    "- Navigation items should have consistent padding: 8px 16px",
+    "- Center all items vertically with align-items: center",
+    "- Use a fixed or sticky header with proper z-index (z-index: 1000)",
+    "- Ensure navigation text is legible and properly spaced",
+    "- Apply consistent hover states to all clickable navigation elements",
+    ""
+))
+
 
 class LLMService:
     def __init__(self):
@@ -1143,15 +1205,12 @@ OUTPUT: Complete HTML with inline CSS. No explanations."""
         headings = data.get('headings', [])
         if headings:
             requirements.append("CONTENT HIERARCHY:")
-            hierarchy = {}
+            hierarchy = defaultdict(list)
             for h in headings[:15]:
-                level = h.get('level', 1)
-                if level not in hierarchy:
-                    hierarchy[level] = []
-                hierarchy[level].append(h.get('text', '').strip())
+                hierarchy[h.get('level', 1)].append(h.get('text', '').strip())
             
-            for level in sorted(hierarchy.keys()):
-                requirements.append(f"H{level}: {', '.join(hierarchy[level][:3])}")
+            for level, texts in sorted(hierarchy.items()):
+                requirements.append(f"H{level}: {', '.join(list(dict.fromkeys(texts))[:3])}")
             requirements.append("")
         
         # Footer information
@@ -1159,39 +1218,19 @@ OUTPUT: Complete HTML with inline CSS. No explanations."""
         footer_links = navigation.get('footerLinks', [])
         if footer_links:
             requirements.append("FOOTER NAVIGATION:")
-            for link in footer_links[:8]:
+            # Skip repeated link texts so the 8 slots go to distinct links
+            seen_texts = set()
+            for link in footer_links:
                 text = link.get('text', '').strip()
-                if text:
+                if text and text not in seen_texts:
+                    seen_texts.add(text)
                     requirements.append(f"- {text}")
+                    if len(seen_texts) >= 8:
+                        break
             requirements.append("")
         
         # Modern styling requirements
-        requirements.extend([
-            "MODERN INTERACTIVE DESIGN REQUIREMENTS:",
-            "- Use CSS transitions for smooth hover effects (0.3s ease-in-out)",
-            "- Add subtle box-shadows and elevate elements on hover",
-            "- Implement proper button states: default, hover, active, focus",
-            "- Use modern CSS features: flexbox, grid, css variables",
-            "- Include smooth scrolling and proper spacing (use rem/em units)",
-            "- Add loading states and micro-interactions where appropriate",
-            "- Ensure all interactive elements have visual feedback",
-            "- Use consistent border-radius (Apple uses 8px-12px typically)",
-            "- Include proper typography scale and consistent spacing system",
-            "",
-            "NAVIGATION BAR SPECIFIC REQUIREMENTS:",
-            "- Create a proper flexbox navigation layout with three sections:",
-            "  1. Logo on the LEFT (flex-shrink: 0)",
-            "  2. Navigation menu in the CENTER (display: flex, gap: 20px)",
-            "  3. Additional items on the RIGHT (if any)",
-            "- Use justify-content: space-between on the main nav container",
-            "- Ensure logo img has proper constraints: max-height: 32px, width: auto",
-            "- Navigation items should have consistent padding: 8px 16px",
-            "- Center all items vertically with align-items: center",
-            "- Use a fixed or sticky header with proper z-index (z-index: 1000)",
-            "- Ensure navigation text is legible and properly spaced",
-            "- Apply consistent hover states to all clickable navigation elements",
-            ""
-        ])
+        requirements.append(_MODERN_DESIGN_REQUIREMENTS)
         
         return requirements
 
@@ -1208,8 +1247,9 @@ OUTPUT: Complete HTML with inline CSS. No explanations."""
         }
         
         # Extract navigation colors
-        if text_content.get('navigationColors'):
-            nav_colors = text_content['navigationColors'][0] if text_content['navigationColors'] else {}
+        navigation_colors = text_content.get('navigationColors')
+        if navigation_colors:
+            nav_colors = navigation_colors[0]
             colors_info['navigation_colors'] = {
                 'background': nav_colors.get('backgroundColor', '#ffffff'),
                 'text': nav_colors.get('textColor', '#000000'),
@@ -1217,59 +1257,64 @@ OUTPUT: Complete HTML with inline CSS. No explanations."""
             }
         
         # Extract button colors
-        if text_content.get('buttonColors'):
-            colors_info['button_colors'] = text_content['buttonColors']
+        button_colors = text_content.get('buttonColors')
+        if button_colors:
+            colors_info['button_colors'] = button_colors
         
         # Extract heading colors
-        if text_content.get('headingColors'):
-            colors_info['heading_colors'] = text_content['headingColors']
+        heading_colors = text_content.get('headingColors')
+        if heading_colors:
+            colors_info['heading_colors'] = heading_colors
         
         # Extract general text colors
-        if text_content.get('allText'):
-            text_elements = text_content['allText']
+        text_elements = text_content.get('allText')
+        if text_elements:
             # Group by text role
-            role_colors = {}
+            role_colors = defaultdict(list)
             for elem in text_elements[:50]:  # Process first 50 text elements
-                if elem.get('styles') and elem['styles'].get('color'):
-                    role = elem['styles'].get('textRole', 'content')
-                    color = elem['styles']['color']
-                    if role not in role_colors:
-                        role_colors[role] = []
-                    role_colors[role].append(color)
+                styles = elem.get('styles')
+                if styles:
+                    color = styles.get('color')
+                    if color:
+                        role_colors[styles.get('textRole', 'content')].append(color)
             
             # Get most common color for each role
             for role, colors in role_colors.items():
                 if colors:
-                    # Find most common color
-                    color_counts = {}
+                    # Histogram by quantized RGB, reporting the first color seen in the winning bucket
+                    bucket_counts = Counter()
+                    bucket_colors = {}
                     for color in colors:
-                        color_counts[color] = color_counts.get(color, 0) + 1
-                    most_common = max(color_counts.items(), key=lambda x: x[1])[0]
+                        bucket = _rgb_bucket(color)
+                        bucket_counts[bucket] += 1
+                        bucket_colors.setdefault(bucket, color)
+                    bucket, count = bucket_counts.most_common(1)[0]
                     colors_info['body_colors'].append({
                         'role': role,
-                        'color': most_common,
-                        'usage_count': color_counts[most_common]
+                        'color': bucket_colors[bucket],
+                        'usage_count': count
                     })
         
         # Extract color palette
-        if text_content.get('colorPalette'):
-            colors_info['color_palette'] = text_content['colorPalette']
+        color_palette = text_content.get('colorPalette')
+        if color_palette:
+            colors_info['color_palette'] = color_palette
         
         return colors_info
 
     def _clean_html_output(self, html_content: str) -> str:
         """Clean and validate HTML output with enhanced formatting and aggressive note removal"""
         # Remove any markdown code block markers
-        if html_content.startswith('```html'):
-            html_content = html_content[7:]
-        if html_content.startswith('```'):
-            html_content = html_content[3:]
-        if html_content.endswith('```'):
-            html_content = html_content[:-3]
+        html_content = html_content.removeprefix('```html').removeprefix('```').removesuffix('```')
         
-        # AGGRESSIVELY remove any LLM explanatory text or notes
-        import re
+        # Fast path: a complete document with no notes needs none of the cleanup below
+        stripped = html_content.strip()
+        if ('[' not in html_content and '```' not in html_content
+                and stripped.startswith(('<!DOCTYPE', '<html'))
+                and not _NOTE_MARKERS_RE.search(html_content)):
+            return stripped
         
+        # AGGRESSIVELY remove any LLM explanatory text or notes
         # Remove notes in square brackets
         html_content = re.sub(r'\[Note:.*?\]', '', html_content, flags=re.DOTALL | re.IGNORECASE)
         html_content = re.sub(r'\[Continuing.*?\]', '', html_content, flags=re.DOTALL | re.IGNORECASE)
@@ -1293,11 +1338,10 @@ OUTPUT: Complete HTML with inline CSS. No explanations."""
             html_content = re.sub(phrase, '', html_content, flags=re.DOTALL | re.IGNORECASE)
         
         # Clean up line by line for more specific filtering
-        lines = html_content.split('\n')
-        cleaned_lines = []
+        buf = io.StringIO()
         in_html = False
         
-        for line in lines:
+        for line in html_content.split('\n'):
             # Skip any lines that contain explanatory notes
             if any(phrase in line.lower() for phrase in [
                 'note:', 'due to length limits', 'i\'ve shown', 'complete implementation',
@@ -1307,21 +1351,21 @@ OUTPUT: Complete HTML with inline CSS. No explanations."""
                 continue
                 
             # Start collecting lines when we hit HTML content
-            if '<!DOCTYPE' in line or '<html' in line or (in_html and line.strip()):
+            if in_html or '<!DOCTYPE' in line or '<html' in line:
+                if in_html:
+                    buf.write('\n')
                 in_html = True
-                cleaned_lines.append(line)
-            elif in_html:
-                cleaned_lines.append(line)
+                buf.write(line)
             # Skip explanatory text before HTML starts
         
-        if cleaned_lines:
-            html_content = '\n'.join(cleaned_lines)
+        if in_html:
+            html_content = buf.getvalue()
         
         # Final cleanup - remove any remaining bracketed content that looks like notes
-        html_content = re.sub(r'\[.*?(?:implementation|pattern|styling|brevity|length).*?\]', '', html_content, flags=re.IGNORECASE)
+        html_content = _BRACKETED_NOTE_RE.sub('', html_content)
         
         # Ensure we have a complete HTML document
-        if not html_content.strip().startswith('<!DOCTYPE') and not html_content.strip().startswith('<html'):
+        if not html_content.lstrip().startswith(('<!DOCTYPE', '<html')):
             html_content = f"""<!DOCTYPE html>
 <html lang="en">
 <head>
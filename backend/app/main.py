@@ -1,17 +1,26 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, HttpUrl
 from typing import Dict, Any
 import os
 from dotenv import load_dotenv
 
-from .scraper import WebsiteScraper
 from .llm_service import LLMService
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="Website Cloning API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Release the scraper's pooled connections on shutdown
+    if scraper is not None:
+        await scraper.aclose()
+
+app = FastAPI(title="Website Cloning API", version="1.0.0", default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # Add CORS middleware
 app.add_middleware(
@@ -24,6 +33,7 @@ app.add_middleware(
 
 # Initialize services lazily
 llm_service = None
+scraper = None
 
 def get_llm_service():
     global llm_service
@@ -31,6 +41,14 @@ def get_llm_service():
         llm_service = LLMService()
     return llm_service
 
+def get_scraper():
+    global scraper
+    if scraper is None:
+        # Imported here so workers that only serve /health never load Playwright
+        from .scraper import WebsiteScraper
+        scraper = WebsiteScraper()
+    return scraper
+
 class CloneRequest(BaseModel):
     url: HttpUrl
 
@@ -49,19 +67,25 @@ def health_check():
     return {"status": "healthy"}
 
 @app.post("/clone", response_model=CloneResponse)
-async def clone_website(request: CloneRequest):
+async def clone_website(request: CloneRequest, include_data: bool = False):
     """
-    Clone a website by scraping it and generating HTML with LLM
+    Clone a website by scraping it and generating HTML with LLM.
+    Pass include_data=true to also return the full scraped data (for debugging).
     """
     try:
         url = str(request.url)
         
-        # Scrape the website
-        scraper = WebsiteScraper()
-        scraped_data = await scraper.scrape_website(url)
+        # Scrape the website while the LLM client is set up in a worker thread
+        scrape = asyncio.create_task(get_scraper().scrape_website(url))
+        try:
+            llm = await asyncio.to_thread(get_llm_service)
+        except BaseException:
+            # Without an LLM client the scrape is useless; don't leave it running unobserved
+            scrape.cancel()
+            raise
+        scraped_data = await scrape
         
         # Generate HTML using LLM
-        llm = get_llm_service()
         html_content = await llm.generate_html_clone(scraped_data)
         
         # Clean the HTML response
@@ -77,28 +101,35 @@ async def clone_website(request: CloneRequest):
         # Count components
         components_count = statistics.get('components', 0)
         
-        # Include full data for debugging, plus basic stats for frontend
-        full_data = scraped_data.get('data', {})
-        articles = full_data.get('articles', [])
+        images = scraped_data.get('images') or ()
+        colors = scraped_data.get('colors') or ()
         
-        return CloneResponse(
-            success=True,
-            html_content=cleaned_html,
-            scraped_data={
-                'title': scraped_data.get('title', ''),
-                'url': scraped_data.get('url', ''),
-                'method': scraped_data.get('method', 'unknown'),  # Track which scraping method was used
-                'text_content_count': total_text_elements,
-                'images_count': len(scraped_data.get('images', [])),
-                'colors_count': len(scraped_data.get('colors', [])),
-                'components_count': components_count,
-                'navigation_items': statistics.get('navigation_items', 0),
-                'buttons_count': statistics.get('buttons', 0),
-                # Include article data for debugging
-                'articles_found': len(articles),
-                'data': full_data  # Include full data structure
-            }
-        )
+        # Basic stats for frontend
+        summary = {
+            'title': scraped_data.get('title', ''),
+            'url': scraped_data.get('url', ''),
+            'method': scraped_data.get('method', 'unknown'),  # Track which scraping method was used
+            'text_content_count': total_text_elements,
+            'images_count': len(images),
+            'colors_count': len(colors),
+            'components_count': components_count,
+            'navigation_items': statistics.get('navigation_items', 0),
+            'buttons_count': statistics.get('buttons', 0)
+        }
+        
+        # Full data is opt-in: it dominates response size and encoding time
+        if include_data:
+            full_data = scraped_data.get('data', {})
+            summary['articles_found'] = len(full_data.get('articles') or ())
+            summary['data'] = full_data
+        
+        # CloneResponse documents the schema; returning the response directly skips re-validating it
+        return ORJSONResponse({
+            'success': True,
+            'html_content': cleaned_html,
+            'error': '',
+            'scraped_data': summary
+        })
         
     except HTTPException:
         raise
@@ -113,12 +144,11 @@ async def scrape_website(request: CloneRequest):
     try:
         url = str(request.url)
         
-        scraper = WebsiteScraper()
-        scraped_data = await scraper.scrape_website(url)
+        scraped_data = await get_scraper().scrape_website(url)
         
-        # Remove the screenshot from response to reduce size
+        # Remove the screenshot from response to reduce size (on a copy; results are cached)
         if 'screenshot' in scraped_data:
-            scraped_data['screenshot'] = f"[Screenshot data - {len(scraped_data['screenshot'])} characters]"
+            scraped_data = {**scraped_data, 'screenshot': f"[Screenshot data - {len(scraped_data['screenshot'])} characters]"}
         
         return scraped_data
         
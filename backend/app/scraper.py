@@ -1,94 +1,535 @@
 import asyncio
 import base64
+import heapq
 import os
 import aiohttp
+import orjson
+import soupsieve as sv
 import random
+import re
+import sys
 import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cache
 from typing import Dict, Optional, List
-from urllib.parse import urljoin, urlparse
-from playwright.async_api import async_playwright
+from urllib.parse import urlsplit
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
 import logging
 from dotenv import load_dotenv
-import os.path
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class ScraperConfig:
+    browserbase_api_key: Optional[str]
+    browserbase_project_id: Optional[str]
+    use_cloud_browser: bool
+
+
+@cache
+def _load_config() -> ScraperConfig:
+    """Load environment variables once per process and snapshot the scraper settings"""
+    # Load environment variables more robustly
+    load_dotenv()  # Current directory
+    
+    # Try backend directory specifically
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    backend_env = os.path.join(script_dir, '..', '.env')
+    if os.path.exists(backend_env):
+        load_dotenv(backend_env, override=True)
+    
+    browserbase_api_key = os.getenv('BROWSERBASE_API_KEY')
+    return ScraperConfig(
+        browserbase_api_key=browserbase_api_key,
+        browserbase_project_id=os.getenv('BROWSERBASE_PROJECT_ID'),
+        use_cloud_browser=bool(browserbase_api_key)
+    )
+
+
+_CONFIG = _load_config()
+
+# Local Chromium pool: number of warm browsers, and pages served before one is restarted
+_BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', '4'))
+_BROWSER_MAX_PAGES = int(os.getenv('BROWSER_MAX_PAGES', '50'))
+
+# Scrape result cache: successes are kept for SCRAPE_CACHE_TTL seconds, failures briefly
+_CACHE_MAXSIZE = 512
+_CACHE_TTL = int(os.getenv('SCRAPE_CACHE_TTL', '600'))
+_NEGATIVE_CACHE_TTL = 60
+
+# End-to-end time budget for one scrape across all fallback methods, in seconds
+_SCRAPE_BUDGET = float(os.getenv('SCRAPE_BUDGET', '45'))
+
+# Concurrency limits: Browserbase sessions at once, and how long a scrape waits for a free slot
+_BROWSERBASE_CONCURRENCY = int(os.getenv('BB_CONCURRENCY', '3'))
+_SLOT_WAIT_TIMEOUT = 10.0
+
+# Seconds to stop calling Browserbase after it reports a concurrency rate limit
+_RATE_LIMIT_COOLDOWN = 60.0
+
+# How long to wait for network idle after DOMContentLoaded before extracting anyway (ms)
+_NETWORK_IDLE_TIMEOUT = 4000
+
+# URL schemes scrape_website accepts
+_URL_SCHEMES = frozenset(('http', 'https'))
+
+# Resource types a text-only scrape never needs
+_TEXT_ONLY_BLOCKED_TYPES = frozenset(('image', 'media', 'font', 'stylesheet'))
+
+# Full-page screenshots; JPEG is several times smaller than PNG for long pages
+_SCREENSHOT_FORMAT = os.getenv('SCREENSHOT_FORMAT', 'jpeg').lower()
+_SCREENSHOT_QUALITY = int(os.getenv('SCREENSHOT_QUALITY', '75'))
+
+# User agents for rotation to avoid detection
+_USER_AGENTS = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+)
+
+# Extra headers for local Playwright pages, to appear more human-like
+_BROWSER_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.5",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+    "Upgrade-Insecure-Requests": "1",
+}
+
+# aiohttp decodes br bodies only when a Brotli binding is installed (aiohttp[speedups])
+try:
+    import brotlicffi  # noqa: F401
+    _ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    try:
+        import brotli  # noqa: F401
+        _ACCEPT_ENCODING = 'gzip, deflate, br'
+    except ImportError:
+        _ACCEPT_ENCODING = 'gzip, deflate'
+
+# Request headers for the HTTP fallback; only User-Agent varies per request
+_HTTP_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': _ACCEPT_ENCODING,
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+}
+
+_CHROMIUM_ARGS = [
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-dev-shm-usage',
+    '--disable-accelerated-2d-canvas',
+    '--no-first-run',
+    '--no-zygote',
+    '--disable-gpu',
+    '--disable-background-timer-throttling',
+    '--disable-backgrounding-occluded-windows',
+    '--disable-renderer-backgrounding'
+]
+
+def _consume_task_result(task: asyncio.Task):
+    """Done callback for tasks that may finish unawaited: mark any exception as retrieved"""
+    if not task.cancelled():
+        task.exception()
+
+
+def _remaining(deadline: float) -> float:
+    """Seconds left before a time.monotonic() deadline, never negative"""
+    return max(0.0, deadline - time.monotonic())
+
+
+def _step_timeout(deadline: float, cap_ms: int) -> int:
+    """Timeout in ms for one step: 70% of the time left before the deadline, capped at cap_ms"""
+    return max(1000, min(cap_ms, int(_remaining(deadline) * 1000 * 0.7)))
+
+
+async def _abort_heavy_resources(route):
+    """Playwright route handler for text-only scrapes: skip assets that only matter visually"""
+    if route.request.resource_type in _TEXT_ONLY_BLOCKED_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+class _TTLCache:
+    """Bounded LRU mapping whose entries expire after a per-entry TTL"""
+    
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+    
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+    
+    def set(self, key, value, ttl: float):
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+
+class _MethodSkipped(Exception):
+    """Raised by a scraping method that was not attempted at all (not configured, no free slot)"""
+
+
+class CircuitBreaker:
+    """Skips a scraping method for a while after repeated failures.
+
+    CLOSED until `threshold` consecutive failures, then OPEN for `cooldown`
+    seconds. After that one trial call is let through (HALF_OPEN): success
+    closes the breaker again, failure re-opens it. Other callers see OPEN while
+    the trial runs; a trial that never reports back is retried after another cooldown.
+    """
+    
+    def __init__(self, threshold: int = 5, recovery_timeout: float = 30.0):
+        self.threshold = threshold
+        self.recovery_timeout = recovery_timeout
+        self.failure_count = 0
+        self.opened_at = None
+        self.cooldown = recovery_timeout
+        self._trial_in_flight = False
+    
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return 'half_open'
+        return 'open'
+    
+    def allow(self) -> bool:
+        state = self.state
+        if state == 'half_open':
+            # Claim the single trial: restarting the clock keeps everyone else on OPEN
+            self._trial_in_flight = True
+            self.opened_at = time.monotonic()
+            return True
+        return state == 'closed'
+    
+    def record_success(self):
+        self.failure_count = 0
+        self.opened_at = None
+        self.cooldown = self.recovery_timeout
+        self._trial_in_flight = False
+    
+    def record_failure(self):
+        self.failure_count += 1
+        if self._trial_in_flight or (self.state == 'closed' and self.failure_count >= self.threshold):
+            self.trip(self.recovery_timeout)
+    
+    def trip(self, cooldown: float):
+        """Open the breaker immediately for `cooldown` seconds"""
+        self.opened_at = time.monotonic()
+        self.cooldown = cooldown
+        self._trial_in_flight = False
+
+
+def _resolve_root_relative(href: str, scheme: str, base_prefix: str) -> str:
+    """Make '/path' and '//host/path' hrefs absolute; other hrefs are returned unchanged"""
+    if href.startswith('//'):
+        return f"{scheme}:{href}"
+    if href.startswith('/'):
+        return base_prefix + href
+    return href
+
+
+def _first_class(element) -> str:
+    """First class name of a BeautifulSoup element (interned), or '' when it has none"""
+    classes = element.get('class')
+    return sys.intern(classes[0]) if classes else ''
+
+
+def _text_score(text: str) -> int:
+    """Cheap relevance score for an allText entry: mid-length text carries the most content"""
+    length = len(text)
+    return length if 20 <= length <= 200 else 0
+
+
+def _texts(elements) -> list:
+    """Stripped, non-empty text of each element"""
+    texts = []
+    for element in elements:
+        text = element.get_text().strip()
+        if text:
+            texts.append(text)
+    return texts
+
+
+# BeautifulSoup tree builder: lxml parses in C; html.parser only if lxml is unavailable
+try:
+    import lxml  # noqa: F401
+    _HTML_PARSER = 'lxml'
+except ImportError:
+    _HTML_PARSER = 'html.parser'
+
+# Tag and class groups used by the HTML extractors
+_HEADING_TAGS = frozenset(('h1', 'h2', 'h3', 'h4', 'h5', 'h6'))
+_TEXT_TAGS = frozenset(('p', 'span', 'div', 'li', 'a'))
+# Caps on allText entries (overall and per tag) so huge DOMs cannot balloon the scrape payload;
+# past the overall cap the highest-scoring entries are kept
+_MAX_TEXT_ITEMS = 2000
+_MAX_TEXT_ITEMS_PER_TAG = 500
+_NAV_CLASSES = frozenset(('nav', 'navbar', 'navigation', 'menu'))
+_CTA_RE = re.compile(r'learn more|buy|shop|get started|try|download|explore|discover|view|watch|order', re.IGNORECASE)
+# Substring matches against an element's joined class attribute
+_PRODUCT_CLASS_RE = re.compile(r'product|item|card', re.IGNORECASE)
+_HERO_CLASS_RE = re.compile(r'hero|banner|jumbotron', re.IGNORECASE)
+_SECTION_CLASS_RE = re.compile(r'section', re.IGNORECASE)
+
+# Class-substring selectors for the product/hero/section containers, compiled once
+_TITLE_OR_NAME_SEL = sv.compile('[class*="title" i], [class*="name" i]')
+_DESCRIPTION_SEL = sv.compile('[class*="description" i], [class*="desc" i], [class*="summary" i]')
+_PRICE_SEL = sv.compile('[class*="price" i], [class*="cost" i]')
+_HEADLINE_SEL = sv.compile('[class*="title" i], [class*="headline" i]')
+_SUBHEADING_SEL = sv.compile('[class*="subtitle" i], [class*="subheading" i]')
+_HEADING_SEL = sv.compile('[class*="title" i], [class*="heading" i]')
+_CONTENT_SEL = sv.compile('[class*="description" i], [class*="text" i], [class*="content" i]')
+# Hacker News story link: a.storylink / a.titleline, or a link inside the current span.titleline wrapper
+_STORY_LINK_SEL = sv.compile('a.storylink, a.titleline, .titleline a')
+
+
 class WebsiteScraper:
     def __init__(self):
-        # Load environment variables more robustly
-        load_dotenv()  # Current directory
-        
-        # Try backend directory specifically
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        backend_env = os.path.join(script_dir, '..', '.env')
-        if os.path.exists(backend_env):
-            load_dotenv(backend_env, override=True)
-        
-        self.browserbase_api_key = os.getenv('BROWSERBASE_API_KEY')
-        self.browserbase_project_id = os.getenv('BROWSERBASE_PROJECT_ID')
-        self.use_cloud_browser = bool(self.browserbase_api_key)
+        # Environment is read once at import time (see _load_config)
+        self.browserbase_api_key = _CONFIG.browserbase_api_key
+        self.browserbase_project_id = _CONFIG.browserbase_project_id
+        self.use_cloud_browser = _CONFIG.use_cloud_browser
         self.page = None
         self.browser = None
         
+        # Circuit breaker for the Browserbase provider only: local Playwright failures are mostly
+        # about the URL being scraped, and must not shut the method off for every other request
+        self._breakers = {
+            '_scrape_with_browserbase': CircuitBreaker()
+        }
+        
+        # Concurrent Browserbase sessions allowed at once
+        self._browserbase_slots = asyncio.Semaphore(_BROWSERBASE_CONCURRENCY)
+        
+        # Recent results by URL, plus in-flight scrapes so concurrent requests share one
+        self._cache = _TTLCache(_CACHE_MAXSIZE)
+        self._inflight = {}
+        self._inflight_waiters = {}
+        
+        # Shared HTTP session, created on first use because it needs a running loop
+        self._http = None
+        
+        # Background Browserbase session deletions, drained in aclose
+        self._pending_cleanups = set()
+        
+        # Warm local browsers, shared across scrapes (see _acquire_browser)
+        self._playwright = None
+        self._browser_pool = None
+        self._browser_uses = {}
+        self._pool_lock = asyncio.Lock()
+        
         # User agents for rotation to avoid detection
-        self.user_agents = [
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        ]
+        self.user_agents = _USER_AGENTS
     
-    async def scrape_website(self, url: str) -> dict:
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the pooled HTTP session, creating it on first use"""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=200, limit_per_host=32, ttl_dns_cache=300, keepalive_timeout=60),
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+        return self._http
+    
+    async def aclose(self):
+        """Close the pooled HTTP session and any warm browsers"""
+        # Shared scrapes outlive their callers; stop any still running before tearing down
+        for task in list(self._inflight.values()):
+            task.cancel()
+        if self._inflight:
+            await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+        
+        # Let in-flight Browserbase cleanups finish while the HTTP session is still open
+        if self._pending_cleanups:
+            await asyncio.gather(*self._pending_cleanups, return_exceptions=True)
+        
+        if self._http is not None and not self._http.closed:
+            await self._http.close()
+        self._http = None
+        
+        if self._browser_pool is not None:
+            while not self._browser_pool.empty():
+                browser = self._browser_pool.get_nowait()
+                if browser is not None:
+                    try:
+                        await browser.close()
+                    except Exception as e:
+                        logger.warning(f"Failed to close pooled browser: {str(e)}")
+            self._browser_pool = None
+            self._browser_uses.clear()
+        
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+    
+    async def scrape_website(self, url: str, total_budget: float = _SCRAPE_BUDGET, text_only: bool = False) -> dict:
         """
         Scrape website using cloud browsers with fallbacks for reliability.
         Primary: Browserbase (cloud)
         Fallback 1: Local Playwright with stealth
         Fallback 2: HTTP requests with parsing
+        All methods together get at most total_budget seconds.
+        text_only skips the screenshot and blocks images, media, fonts and stylesheets.
         """
         
         # Validate URL
         if not self._is_valid_url(url):
             raise ValueError(f"Invalid URL: {url}")
         
-        methods = [
-            self._scrape_with_browserbase,
-            self._scrape_with_local_playwright,
-            self._scrape_with_http_fallback
-        ]
+        key = (urlsplit(url)._replace(fragment='').geturl(), text_only)
+        cached = self._cache.get(key)
+        if cached is not None:
+            logger.info(f"Serving cached scrape for {url}")
+            if isinstance(cached, str):
+                # Failures are cached as their message; raise a fresh exception per hit
+                raise Exception(cached)
+            return cached
+        
+        # Concurrent requests for the same URL share one scrape. It runs as its own task, so a
+        # caller that disconnects stops waiting without cancelling it for the others.
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._scrape_and_cache(url, key, total_budget, text_only))
+            task.add_done_callback(_consume_task_result)
+            task.add_done_callback(lambda done: self._inflight.pop(key, None))
+            self._inflight[key] = task
+        
+        self._inflight_waiters[key] = self._inflight_waiters.get(key, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            # The last caller to give up stops the shared scrape; nobody is left to use it
+            if self._inflight_waiters.get(key) == 1 and not task.done():
+                task.cancel()
+            raise
+        finally:
+            waiters = self._inflight_waiters.pop(key) - 1
+            if waiters:
+                self._inflight_waiters[key] = waiters
+    
+    async def _scrape_and_cache(self, url: str, key: tuple, total_budget: float, text_only: bool) -> dict:
+        """Run one scrape within the time budget and cache its outcome"""
+        deadline = time.monotonic() + total_budget
+        try:
+            result = await asyncio.wait_for(self._scrape_uncached(url, deadline, text_only), total_budget)
+        except asyncio.TimeoutError:
+            message = f"Scraping {url} exceeded the {total_budget}s time budget"
+            self._cache.set(key, message, _NEGATIVE_CACHE_TTL)
+            raise Exception(message)
+        except Exception as e:
+            self._cache.set(key, str(e), _NEGATIVE_CACHE_TTL)
+            raise
+        self._cache.set(key, result, _CACHE_TTL)
+        return result
+    
+    async def scrape_many(self, urls: List[str], concurrency: int = 8, text_only: bool = False) -> List[dict]:
+        """
+        Scrape several URLs concurrently, returning results in input order.
+        A URL that fails yields {'url': ..., 'error': ...} instead of raising.
+        The Browserbase slots and local browser pool still cap the load on each backend.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def scrape_one(url: str) -> dict:
+            async with semaphore:
+                try:
+                    return await self.scrape_website(url, text_only=text_only)
+                except Exception as e:
+                    logger.warning(f"Batch scrape failed for {url}: {str(e)}")
+                    return {'url': url, 'error': str(e)}
         
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(scrape_one(url)) for url in urls]
+        return [task.result() for task in tasks]
+    
+    async def _scrape_uncached(self, url: str, deadline: float, text_only: bool) -> dict:
+        """Try the browser methods in order, then the HTTP fallback"""
+        methods = [self._scrape_with_local_playwright]
+        if self.use_cloud_browser:
+            methods.insert(0, self._scrape_with_browserbase)
+        
+        # Hedge: once a browser method has failed or been skipped, the cheap HTTP fallback starts
+        # alongside the remaining ones so it is ready (not just beginning) if they fail too.
+        # Healthy scrapes never fetch the page twice.
+        fallback = None
         last_error = None
         
-        for i, method in enumerate(methods):
-            try:
-                logger.info(f"Attempting scraping method {i+1}: {method.__name__}")
-                result = await method(url)
-                if result:
-                    logger.info(f"Successfully scraped {url} using {method.__name__}")
-                    return result
-            except Exception as e:
-                logger.warning(f"Method {method.__name__} failed for {url}: {str(e)}")
-                last_error = e
-                # Add delay between retries
-                if i < len(methods) - 1:
-                    await asyncio.sleep(2 ** i)  # Exponential backoff
+        try:
+            for i, method in enumerate(methods):
+                breaker = self._breakers.get(method.__name__)
+                if breaker and not breaker.allow():
+                    logger.info(f"Skipping scraping method {i+1}: {method.__name__} (circuit open)")
+                else:
+                    try:
+                        logger.info(f"Attempting scraping method {i+1}: {method.__name__}")
+                        result = await method(url, deadline, text_only)
+                        if result:
+                            if breaker:
+                                breaker.record_success()
+                            logger.info(f"Successfully scraped {url} using {method.__name__}")
+                            return result
+                        if breaker:
+                            breaker.record_failure()
+                    except _MethodSkipped as e:
+                        logger.info(f"Skipping scraping method {i+1}: {method.__name__} ({str(e)})")
+                    except Exception as e:
+                        logger.warning(f"Method {method.__name__} failed for {url}: {str(e)}")
+                        last_error = e
+                        if breaker:
+                            breaker.record_failure()
+                
+                if fallback is None:
+                    fallback = asyncio.create_task(self._scrape_with_http_fallback(url, deadline, text_only))
+                    fallback.add_done_callback(_consume_task_result)
+            
+            logger.info(f"Attempting scraping method {len(methods) + 1}: _scrape_with_http_fallback")
+            result = await fallback
+            if result:
+                logger.info(f"Successfully scraped {url} using _scrape_with_http_fallback")
+                return result
+        finally:
+            if fallback is not None:
+                fallback.cancel()
         
         raise Exception(f"All scraping methods failed. Last error: {str(last_error)}")
     
-    async def _scrape_with_browserbase(self, url: str) -> Optional[dict]:
+    async def _scrape_with_browserbase(self, url: str, deadline: float, text_only: bool = False) -> Optional[dict]:
         """
         Use Browserbase cloud browser service for reliable scraping.
         Handles IP rotation, proxy management, and anti-bot measures.
         """
+        # Missing config and busy slots never reach the provider; they skip the method
+        # without counting against its circuit breaker
         if not self.browserbase_api_key:
-            logger.info("Browserbase API key not found, skipping cloud browser method")
-            return None
+            raise _MethodSkipped("Browserbase API key not found")
         
         if not self.browserbase_project_id:
-            logger.info("Browserbase project ID not found, skipping cloud browser method")
-            return None
+            raise _MethodSkipped("Browserbase project ID not found")
         
         if not self.browserbase_api_key.startswith('bb_'):
-            logger.warning(f"Browserbase API key seems invalid (doesn't start with 'bb_'): {self.browserbase_api_key[:10]}...")
-            return None
+            raise _MethodSkipped(f"Browserbase API key seems invalid (doesn't start with 'bb_'): {self.browserbase_api_key[:10]}...")
+        
+        # Cap concurrent Browserbase sessions so bursts queue briefly instead of hitting 429s
+        try:
+            await asyncio.wait_for(self._browserbase_slots.acquire(), min(_SLOT_WAIT_TIMEOUT, _remaining(deadline)))
+        except asyncio.TimeoutError:
+            raise _MethodSkipped("All Browserbase session slots are busy")
         
         try:
             logger.info(f"🚀 ATTEMPTING BROWSERBASE: Using API key: {self.browserbase_api_key[:15]}...")
@@ -101,62 +542,69 @@ class WebsiteScraper:
                 "timeout": 300  # 5 minutes in seconds
             }
             
-            async with aiohttp.ClientSession() as session:
-                # Create Browserbase session
-                logger.info("Creating Browserbase session...")
-                async with session.post(
-                    "https://api.browserbase.com/v1/sessions",
-                    headers={
-                        "x-bb-api-key": self.browserbase_api_key,
-                        "Content-Type": "application/json"
-                    },
-                    json=session_data
-                ) as response:
-                    response_text = await response.text()
-                    logger.info(f"Browserbase response status: {response.status}")
-                    logger.info(f"Browserbase response: {response_text[:200]}...")
-                    
-                    if response.status == 429:
-                        logger.warning(f"⚠️ Browserbase rate limit hit (concurrent sessions): {response_text}")
-                        return None
-                    elif response.status not in [200, 201]:
-                        logger.error(f"Failed to create Browserbase session: {response.status} - {response_text}")
-                        return None
-                    
-                    session_info = await response.json()
-                    session_id = session_info.get("id")
-                    ws_url = session_info.get("connectUrl")
-                    
-                    logger.info(f"Browserbase session created: {session_id}")
-                    logger.info(f"WebSocket URL: {ws_url}")
+            session = await self._get_session()
+            
+            # Create Browserbase session
+            logger.info("Creating Browserbase session...")
+            async with session.post(
+                "https://api.browserbase.com/v1/sessions",
+                headers={
+                    "x-bb-api-key": self.browserbase_api_key,
+                    "Content-Type": "application/json"
+                },
+                data=orjson.dumps(session_data)
+            ) as response:
+                response_text = await response.text()
+                logger.info(f"Browserbase response status: {response.status}")
+                logger.info(f"Browserbase response: {response_text[:200]}...")
                 
-                if not ws_url:
-                    logger.error("No WebSocket URL returned from Browserbase")
+                if response.status == 429:
+                    logger.warning(f"⚠️ Browserbase rate limit hit (concurrent sessions): {response_text}")
+                    # Back off from Browserbase entirely for a while rather than retrying per URL
+                    self._breakers['_scrape_with_browserbase'].trip(_RATE_LIMIT_COOLDOWN)
+                    return None
+                elif response.status not in [200, 201]:
+                    logger.error(f"Failed to create Browserbase session: {response.status} - {response_text}")
                     return None
                 
-                # Connect to the cloud browser via WebSocket
-                logger.info("Connecting to Browserbase browser...")
+                # Parse the body already read for logging instead of decoding it a second time
+                session_info = orjson.loads(response_text)
+                session_id = session_info.get("id")
+                ws_url = session_info.get("connectUrl")
+                
+                logger.info(f"Browserbase session created: {session_id}")
+                logger.info(f"WebSocket URL: {ws_url}")
+            
+            if not ws_url:
+                logger.error("No WebSocket URL returned from Browserbase")
+                return None
+            
+            # Connect to the cloud browser via WebSocket
+            logger.info("Connecting to Browserbase browser...")
+            try:
                 async with async_playwright() as p:
                     browser = await p.chromium.connect_over_cdp(ws_url)
-                    context = browser.contexts[0] if browser.contexts else await browser.new_context()
-                    page = await context.new_page()
-                    
                     try:
+                        context = browser.contexts[0] if browser.contexts else await browser.new_context()
+                        page = await context.new_page()
+                        
+                        if text_only:
+                            await page.route("**/*", _abort_heavy_resources)
+                        
                         logger.info(f"Navigating to {url}...")
                         # Navigate with advanced options
-                        await page.goto(url, wait_until="networkidle", timeout=30000)
-                        await page.wait_for_timeout(2000)  # Allow dynamic content to load
+                        await page.goto(url, wait_until="domcontentloaded", timeout=_step_timeout(deadline, 30000))
+                        await self._wait_until_ready(page)  # Allow dynamic content to load
                         
-                        # Take screenshot
-                        screenshot = await page.screenshot(full_page=True, type="png")
-                        screenshot_base64 = base64.b64encode(screenshot).decode("utf-8")
-                        title = await page.title()
+                        # Take screenshot, read the title and extract comprehensive page data concurrently
+                        screenshot_base64, title, page_data = await asyncio.gather(
+                            self._capture_screenshot(page, text_only),
+                            page.title(),
+                            self._extract_page_data(page)
+                        )
                         
                         logger.info(f"Successfully loaded page: {title}")
                         
-                        # Extract comprehensive page data
-                        page_data = await self._extract_page_data(page)
-                        
                         logger.info(f"Extracted {page_data.get('articles_found', 0)} articles using Browserbase")
                         
                         return {
@@ -168,51 +616,47 @@ class WebsiteScraper:
                         }
                     
                     finally:
-                        await page.close()
+                        # Disconnecting the CDP client also drops the pages it opened
                         await browser.close()
-                        
-                        # Clean up Browserbase session
-                        try:
-                            async with session.delete(
-                                f"https://api.browserbase.com/v1/sessions/{session_id}",
-                                headers={"x-bb-api-key": self.browserbase_api_key}
-                            ) as del_response:
-                                if del_response.status == 200:
-                                    logger.info(f"✅ Successfully cleaned up Browserbase session: {session_id}")
-                                else:
-                                    logger.warning(f"⚠️ Session cleanup returned status: {del_response.status}")
-                        except Exception as cleanup_error:
-                            logger.warning(f"⚠️ Failed to cleanup Browserbase session: {cleanup_error}")
+            finally:
+                # Release the Browserbase session even if connecting, navigating or closing failed
+                # or was cancelled; it runs in the background so results don't wait on the DELETE
+                if session_id:
+                    cleanup = asyncio.create_task(self._delete_browserbase_session(session_id))
+                    self._pending_cleanups.add(cleanup)
+                    cleanup.add_done_callback(self._pending_cleanups.discard)
         
         except Exception as e:
             logger.error(f"Browserbase scraping failed: {str(e)}")
             import traceback
             logger.error(f"Browserbase error traceback: {traceback.format_exc()}")
             return None
+        finally:
+            self._browserbase_slots.release()
+    
+    async def _delete_browserbase_session(self, session_id: str):
+        """Release a Browserbase session"""
+        try:
+            session = await self._get_session()
+            async with session.delete(
+                f"https://api.browserbase.com/v1/sessions/{session_id}",
+                headers={"x-bb-api-key": self.browserbase_api_key}
+            ) as del_response:
+                if del_response.status == 200:
+                    logger.info(f"✅ Successfully cleaned up Browserbase session: {session_id}")
+                else:
+                    logger.warning(f"⚠️ Session cleanup returned status: {del_response.status}")
+        except Exception as cleanup_error:
+            logger.warning(f"⚠️ Failed to cleanup Browserbase session: {cleanup_error}")
     
-    async def _scrape_with_local_playwright(self, url: str) -> Optional[dict]:
+    async def _scrape_with_local_playwright(self, url: str, deadline: float, text_only: bool = False) -> Optional[dict]:
         """
         Fallback to local Playwright with stealth mode and anti-detection measures.
         """
         try:
-            async with async_playwright() as p:
-                # Launch with stealth options
-                browser = await p.chromium.launch(
-                    headless=True,
-                    args=[
-                        '--no-sandbox',
-                        '--disable-setuid-sandbox',
-                        '--disable-dev-shm-usage',
-                        '--disable-accelerated-2d-canvas',
-                        '--no-first-run',
-                        '--no-zygote',
-                        '--disable-gpu',
-                        '--disable-background-timer-throttling',
-                        '--disable-backgrounding-occluded-windows',
-                        '--disable-renderer-backgrounding'
-                    ]
-                )
-                
+            browser = await self._acquire_browser()
+            context = None
+            try:
                 context = await browser.new_context(
                     viewport={"width": 1920, "height": 1080},
                     user_agent=random.choice(self.user_agents),
@@ -220,282 +664,193 @@ class WebsiteScraper:
                     accept_downloads=False,
                     ignore_https_errors=True
                 )
+                if text_only:
+                    await context.route("**/*", _abort_heavy_resources)
                 
                 page = await context.new_page()
                 
                 # Set extra headers to appear more human-like
-                await page.set_extra_http_headers({
-                    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
-                    "Accept-Language": "en-US,en;q=0.5",
-                    "Accept-Encoding": "gzip, deflate",
-                    "Connection": "keep-alive",
-                    "Upgrade-Insecure-Requests": "1",
-                })
+                await page.set_extra_http_headers(_BROWSER_HEADERS)
                 
-                try:
-                    # Navigate with retries
-                    max_retries = 3
-                    for attempt in range(max_retries):
-                        try:
-                            await page.goto(url, wait_until="networkidle", timeout=45000)
-                            break
-                        except Exception as nav_error:
-                            if attempt == max_retries - 1:
-                                raise nav_error
-                            await asyncio.sleep(2 ** attempt)
-                    
-                    # Wait for content to load
-                    await page.wait_for_timeout(3000)
-                    
-                    # Take screenshot
-                    screenshot = await page.screenshot(full_page=True, type="png")
-                    screenshot_base64 = base64.b64encode(screenshot).decode("utf-8")
-                    title = await page.title()
-                    
-                    # Extract page data
-                    page_data = await self._extract_page_data(page)
-                    
-                    return {
-                        "url": url,
-                        "title": title,
-                        "screenshot": screenshot_base64,
-                        "data": page_data,
-                        "method": "local_playwright"
-                    }
+                # Navigate with retries
+                max_retries = 3
+                for attempt in range(max_retries):
+                    try:
+                        await page.goto(url, wait_until="domcontentloaded", timeout=_step_timeout(deadline, 45000))
+                        break
+                    except Exception as nav_error:
+                        if attempt == max_retries - 1:
+                            raise nav_error
+                        await asyncio.sleep(min(2 ** attempt, _remaining(deadline)))
+                
+                # Wait for content to load
+                await self._wait_until_ready(page)
                 
+                # Take screenshot, read the title and extract page data concurrently
+                screenshot_base64, title, page_data = await asyncio.gather(
+                    self._capture_screenshot(page, text_only),
+                    page.title(),
+                    self._extract_page_data(page)
+                )
+                
+                return {
+                    "url": url,
+                    "title": title,
+                    "screenshot": screenshot_base64,
+                    "data": page_data,
+                    "method": "local_playwright"
+                }
+            
+            finally:
+                # Closing the context closes its pages; the browser goes back to the pool even
+                # if the close fails (crashed browser) or the scrape is cancelled mid-close
+                try:
+                    if context is not None:
+                        await context.close()
                 finally:
-                    await page.close()
-                    await context.close()
-                    await browser.close()
+                    await self._release_browser(browser)
         
         except Exception as e:
             logger.error(f"Local Playwright scraping failed: {str(e)}")
             return None
     
-    async def _scrape_with_http_fallback(self, url: str) -> Optional[dict]:
+    async def _wait_until_ready(self, page):
+        """Wait briefly for the network to settle after DOMContentLoaded"""
+        try:
+            await page.wait_for_load_state('networkidle', timeout=_NETWORK_IDLE_TIMEOUT)
+        except PlaywrightTimeoutError:
+            # Long-polling trackers and ads can keep the network busy; the DOM is already usable
+            pass
+    
+    async def _capture_screenshot(self, page, text_only: bool = False) -> str:
+        """Take a full-page screenshot and return it base64-encoded ('' for text-only scrapes)"""
+        if text_only:
+            return ''
+        options = {'full_page': True, 'type': _SCREENSHOT_FORMAT}
+        if _SCREENSHOT_FORMAT == 'jpeg':
+            options['quality'] = _SCREENSHOT_QUALITY
+        screenshot = await page.screenshot(**options)
+        # Encoding a multi-megabyte image is CPU work; keep it off the event loop
+        encoded = await asyncio.to_thread(base64.b64encode, screenshot)
+        # Drop the raw image before building the str so only one large copy is alive at a time
+        del screenshot
+        return encoded.decode('ascii')
+    
+    async def _ensure_browser_pool(self):
+        """Start Playwright once and fill the pool with browser slots"""
+        if self._browser_pool is not None:
+            return
+        async with self._pool_lock:
+            if self._browser_pool is None:
+                self._playwright = await async_playwright().start()
+                pool = asyncio.Queue()
+                # Slots start empty; browsers are launched on first checkout
+                for _ in range(_BROWSER_POOL_SIZE):
+                    pool.put_nowait(None)
+                self._browser_pool = pool
+    
+    async def _acquire_browser(self):
+        """Check a warm browser out of the pool, launching one if the slot is empty"""
+        await self._ensure_browser_pool()
+        # The pool doubles as the bulkhead: at most _BROWSER_POOL_SIZE local browsers run at once
+        browser = await asyncio.wait_for(self._browser_pool.get(), _SLOT_WAIT_TIMEOUT)
+        if browser is not None:
+            if browser.is_connected():
+                return browser
+            self._browser_uses.pop(browser, None)
+        try:
+            # Launch with stealth options
+            browser = await self._playwright.chromium.launch(headless=True, args=_CHROMIUM_ARGS)
+        except BaseException:
+            # Also on cancellation: a slot that is never returned shrinks the pool for good
+            self._browser_pool.put_nowait(None)
+            raise
+        self._browser_uses[browser] = 0
+        return browser
+    
+    async def _release_browser(self, browser):
+        """Return a browser to the pool, recycling it after too many pages"""
+        uses = self._browser_uses.get(browser, 0) + 1
+        if uses >= _BROWSER_MAX_PAGES or not browser.is_connected():
+            # Restart long-lived browsers to keep Chromium memory from creeping up. The slot is
+            # freed before awaiting the close so a failed or cancelled close cannot leak it.
+            self._browser_uses.pop(browser, None)
+            self._browser_pool.put_nowait(None)
+            try:
+                await browser.close()
+            except Exception as e:
+                logger.warning(f"Failed to close recycled browser: {str(e)}")
+        else:
+            self._browser_uses[browser] = uses
+            self._browser_pool.put_nowait(browser)
+    
+    async def _scrape_with_http_fallback(self, url: str, deadline: float, text_only: bool = False) -> Optional[dict]:
         """
         Final fallback using HTTP requests with HTML parsing.
         Limited functionality but works when browsers are blocked.
         """
         try:
-            headers = {
-                'User-Agent': random.choice(self.user_agents),
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-            }
+            headers = {**_HTTP_HEADERS, 'User-Agent': random.choice(self.user_agents)}
             
-            timeout = aiohttp.ClientTimeout(total=30)
+            timeout = aiohttp.ClientTimeout(total=_step_timeout(deadline, 30000) / 1000)
             
-            async with aiohttp.ClientSession(timeout=timeout, headers=headers) as session:
-                async with session.get(url) as response:
-                    if response.status != 200:
-                        logger.error(f"HTTP request failed with status: {response.status}")
-                        return None
-                    
-                    html_content = await response.text()
-                    
-                    # Basic HTML parsing without JavaScript execution
-                    from bs4 import BeautifulSoup
-                    soup = BeautifulSoup(html_content, 'html.parser')
-                    
-                    # Extract basic information
-                    title = soup.find('title')
-                    title_text = title.get_text().strip() if title else "Unknown Title"
-                    
-                    # Extract all text content for comprehensive coverage
-                    text_content = {
-                        'allText': [],
-                        'buttonTexts': [],
-                        'navigationText': [],
-                        'productContent': [],
-                        'heroContent': [],
-                        'sectionContent': [],
-                        'footerContent': []
-                    }
-                    
-                    # Extract button and CTA text
-                    for button in soup.find_all(['button', 'input']):
-                        btn_text = ''
-                        if button.name == 'input' and button.get('type') in ['button', 'submit']:
-                            btn_text = button.get('value', '').strip()
-                        else:
-                            btn_text = button.get_text().strip()
-                        
-                        if btn_text:
-                            text_content['buttonTexts'].append({
-                                'text': btn_text,
-                                'type': button.name,
-                                'className': button.get('class', [''])[0] if button.get('class') else ''
-                            })
-                    
-                    # Extract CTA links
-                    for a in soup.find_all('a'):
-                        link_text = a.get_text().strip().lower()
-                        if any(keyword in link_text for keyword in ['learn more', 'buy', 'shop', 'get started', 'try', 'download', 'explore', 'discover', 'view', 'watch', 'order']):
-                            text_content['buttonTexts'].append({
-                                'text': a.get_text().strip(),
-                                'type': 'a',
-                                'className': a.get('class', [''])[0] if a.get('class') else '',
-                                'href': a.get('href', '')
-                            })
-                    
-                    # Extract navigation text
-                    nav_elements = soup.find_all(['nav', 'header']) + soup.find_all(class_=['nav', 'navbar', 'navigation', 'menu'])
-                    for nav in nav_elements:
-                        for a in nav.find_all('a'):
-                            nav_text = a.get_text().strip()
-                            if nav_text:
-                                text_content['navigationText'].append({
-                                    'text': nav_text,
-                                    'href': a.get('href', ''),
-                                    'className': a.get('class', [''])[0] if a.get('class') else ''
-                                })
-                    
-                    # Extract product content
-                    product_selectors = soup.find_all(class_=lambda x: x and any(term in x.lower() for term in ['product', 'item', 'card']))
-                    for product in product_selectors:
-                        title_elem = product.find(['h1', 'h2', 'h3']) or product.find(class_=lambda x: x and any(term in x.lower() for term in ['title', 'name']))
-                        desc_elem = product.find('p') or product.find(class_=lambda x: x and any(term in x.lower() for term in ['description', 'desc', 'summary']))
-                        price_elem = product.find(class_=lambda x: x and any(term in x.lower() for term in ['price', 'cost']))
-                        
-                        if title_elem or desc_elem:
-                            product_data = {
-                                'title': title_elem.get_text().strip() if title_elem else '',
-                                'description': desc_elem.get_text().strip() if desc_elem else '',
-                                'price': price_elem.get_text().strip() if price_elem else '',
-                                'buttonText': [btn.get_text().strip() for btn in product.find_all(['button', 'a']) if btn.get_text().strip()],
-                                'className': product.get('class', [''])[0] if product.get('class') else ''
-                            }
-                            if product_data['title'] or product_data['description']:
-                                text_content['productContent'].append(product_data)
-                    
-                    # Extract hero/banner content
-                    hero_selectors = soup.find_all(class_=lambda x: x and any(term in x.lower() for term in ['hero', 'banner', 'jumbotron']))
-                    for hero in hero_selectors:
-                        title_elem = hero.find(['h1', 'h2']) or hero.find(class_=lambda x: x and any(term in x.lower() for term in ['title', 'headline']))
-                        subtitle_elem = hero.find(['h3', 'h4', 'p']) or hero.find(class_=lambda x: x and any(term in x.lower() for term in ['subtitle', 'subheading']))
-                        
-                        if title_elem or subtitle_elem:
-                            hero_data = {
-                                'title': title_elem.get_text().strip() if title_elem else '',
-                                'subtitle': subtitle_elem.get_text().strip() if subtitle_elem else '',
-                                'ctaText': [btn.get_text().strip() for btn in hero.find_all(['button', 'a']) if btn.get_text().strip()],
-                                'className': hero.get('class', [''])[0] if hero.get('class') else ''
-                            }
-                            if hero_data['title'] or hero_data['subtitle']:
-                                text_content['heroContent'].append(hero_data)
-                    
-                    # Extract section content
-                    sections = soup.find_all(['section', 'article']) + soup.find_all(class_=lambda x: x and 'section' in x.lower())
-                    for section in sections:
-                        heading_elem = section.find(['h1', 'h2', 'h3']) or section.find(class_=lambda x: x and any(term in x.lower() for term in ['title', 'heading']))
-                        content_elem = section.find('p') or section.find(class_=lambda x: x and any(term in x.lower() for term in ['description', 'text', 'content']))
-                        
-                        if heading_elem or content_elem:
-                            section_data = {
-                                'heading': heading_elem.get_text().strip() if heading_elem else '',
-                                'content': content_elem.get_text().strip()[:200] if content_elem else '',
-                                'className': section.get('class', [''])[0] if section.get('class') else ''
-                            }
-                            if section_data['heading'] or section_data['content']:
-                                text_content['sectionContent'].append(section_data)
-                    
-                    # Extract footer content
-                    footer_elements = soup.find_all('footer') + soup.find_all(class_=['footer'])
-                    for footer in footer_elements:
-                        footer_data = {
-                            'links': [a.get_text().strip() for a in footer.find_all('a') if a.get_text().strip()],
-                            'text': [el.get_text().strip() for el in footer.find_all(['p', 'span', 'div']) if el.get_text().strip() and len(el.get_text().strip()) < 100],
-                            'className': footer.get('class', [''])[0] if footer.get('class') else ''
-                        }
-                        if footer_data['links'] or footer_data['text']:
-                            text_content['footerContent'].append(footer_data)
-                    
-                    # Extract all visible text elements
-                    for tag in ['p', 'span', 'div', 'li', 'a']:
-                        for elem in soup.find_all(tag):
-                            elem_text = elem.get_text().strip()
-                            if elem_text and len(elem_text) < 500 and len(elem_text) > 0:
-                                text_content['allText'].append({
-                                    'tagName': tag,
-                                    'text': elem_text,
-                                    'className': elem.get('class', [''])[0] if elem.get('class') else '',
-                                    'id': elem.get('id', '')
-                                })
-
-                    # Basic article extraction for Hacker News
-                    articles = []
-                    for tr in soup.find_all('tr', class_='athing'):
-                        title_link = tr.find('a', class_='storylink') or tr.find('a', class_='titleline')
-                        if title_link:
-                            href = title_link.get('href', '')
-                            if href.startswith('/'):
-                                href = urljoin(url, href)
-                            
-                            articles.append({
-                                'index': len(articles) + 1,
-                                'title': title_link.get_text().strip(),
-                                'href': href,
-                                'score': '',
-                                'author': '',
-                                'time': '',
-                                'comments': '',
-                                'className': tr.get('class', [''])[0] if tr.get('class') else '',
-                                'id': tr.get('id', '')
-                            })
-                    
-                    return {
-                        "url": url,
-                        "title": title_text,
-                        "screenshot": "",  # No screenshot available
-                        "data": {
-                            'html': str(soup),
-                            'headings': headings,
-                            'links': [],
-                            'articles': articles,
-                            'genericArticles': [],
-                            'navigation': {'headerLinks': [], 'sidebarLinks': [], 'mainContentLinks': []},
-                            'layout': {'hasTopNav': False, 'hasSidebar': False, 'isResponsive': False},
-                            'colors': [],
-                            'viewport': {'width': 1920, 'height': 1080},
-                            'textContent': text_content
-                        },
-                        "method": "http_fallback"
-                    }
+            session = await self._get_session()
+            async with session.get(url, headers=headers, timeout=timeout) as response:
+                if response.status != 200:
+                    logger.error(f"HTTP request failed with status: {response.status}")
+                    return None
+                
+                raw = await response.read()
+                charset = response.charset or 'utf-8'
+            
+            try:
+                html_content = raw.decode(charset, errors='replace')
+            except LookupError:
+                # Unknown charset label in the Content-Type header
+                html_content = raw.decode('utf-8', errors='replace')
+            del raw
+            
+            # A hedge cancelled while downloading has no use for the parse, and a worker thread
+            # cannot be stopped once started
+            if asyncio.current_task().cancelling():
+                raise asyncio.CancelledError()
+            
+            # Parsing is CPU-bound; run it in a worker thread so other scrapes keep progressing
+            title_text, page_data = await asyncio.to_thread(self._parse_html, html_content, url)
+            
+            return {
+                "url": url,
+                "title": title_text,
+                "screenshot": "",  # No screenshot available
+                "data": page_data,
+                "method": "http_fallback"
+            }
         
         except Exception as e:
             logger.error(f"HTTP fallback scraping failed: {str(e)}")
             return None
     
-    def _extract_basic_html_data(self, soup, url: str) -> dict:
-        """Extract basic data from BeautifulSoup object"""
+    def _parse_html(self, html_content: str, url: str) -> tuple:
+        """Parse fetched HTML without JavaScript execution and return (title, page data)"""
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html_content, _HTML_PARSER)
+        
+        # Extract basic information
+        title = soup.find('title')
+        title_text = title.get_text().strip() if title else "Unknown Title"
+        
+        return title_text, self._extract_basic_html_data(soup, url, html_content)
+    
+    def _extract_basic_html_data(self, soup, url: str, html: str = '') -> dict:
+        """Extract basic data from BeautifulSoup object in a single DOM walk"""
         try:
-            # Extract links
-            links = []
-            for a in soup.find_all('a', href=True):
-                href = a['href']
-                if href.startswith('/'):
-                    href = urljoin(url, href)
-                links.append({
-                    'text': a.get_text().strip(),
-                    'href': href,
-                    'className': a.get('class', [''])[0] if a.get('class') else ''
-                })
+            # Parse the page URL once; root-relative hrefs only need its scheme and host
+            base = urlsplit(url)
+            base_prefix = f"{base.scheme}://{base.netloc}"
             
-            # Extract headings
+            links = []
             headings = []
-            for i in range(1, 7):
-                for h in soup.find_all(f'h{i}'):
-                    headings.append({
-                        'level': i,
-                        'text': h.get_text().strip(),
-                        'className': h.get('class', [''])[0] if h.get('class') else ''
-                    })
-            
-            # Extract all text content for comprehensive coverage
+            articles = []
             text_content = {
                 'allText': [],
                 'buttonTexts': [],
@@ -505,189 +860,166 @@ class WebsiteScraper:
                 'sectionContent': [],
                 'footerContent': []
             }
+            all_text = text_content['allText']
+            text_tag_counts = dict.fromkeys(_TEXT_TAGS, 0)
+            last_text = None
             
-            # Extract button and CTA text
-            for button in soup.find_all(['button', 'input']):
-                btn_text = ''
-                if button.name == 'input' and button.get('type') in ['button', 'submit']:
-                    btn_text = button.get('value', '').strip()
-                else:
-                    btn_text = button.get_text().strip()
+            for elem in soup.find_all(True):
+                name = elem.name
+                classes = elem.get('class') or []
+                # Templated pages repeat the same class names thousands of times; share one string each
+                first_class = sys.intern(classes[0]) if classes else ''
+                class_text = ' '.join(classes)
                 
-                if btn_text:
-                    text_content['buttonTexts'].append({
-                        'text': btn_text,
-                        'type': button.name,
-                        'className': button.get('class', [''])[0] if button.get('class') else ''
-                    })
-            
-            # Extract CTA links
-            for a in soup.find_all('a'):
-                link_text = a.get_text().strip().lower()
-                if any(keyword in link_text for keyword in ['learn more', 'buy', 'shop', 'get started', 'try', 'download', 'explore', 'discover', 'view', 'watch', 'order']):
-                    text_content['buttonTexts'].append({
-                        'text': a.get_text().strip(),
-                        'type': 'a',
-                        'className': a.get('class', [''])[0] if a.get('class') else '',
-                        'href': a.get('href', '')
+                # Extract headings
+                if name in _HEADING_TAGS:
+                    headings.append({
+                        'level': int(name[1]),
+                        'text': elem.get_text().strip(),
+                        'className': first_class
                     })
-            
-            # Extract navigation text
-            nav_elements = soup.find_all(['nav', 'header']) + soup.find_all(class_=['nav', 'navbar', 'navigation', 'menu'])
-            for nav in nav_elements:
-                for a in nav.find_all('a'):
-                    nav_text = a.get_text().strip()
-                    if nav_text:
-                        text_content['navigationText'].append({
-                            'text': nav_text,
-                            'href': a.get('href', ''),
-                            'className': a.get('class', [''])[0] if a.get('class') else ''
-                        })
-            
-            # Extract product content
-            product_selectors = soup.find_all(class_=lambda x: x and any(term in x.lower() for term in ['product', 'item', 'card']))
-            for product in product_selectors:
-                title_elem = product.find(['h1', 'h2', 'h3']) or product.find(class_=lambda x: x and any(term in x.lower() for term in ['title', 'name']))
-                desc_elem = product.find('p') or product.find(class_=lambda x: x and any(term in x.lower() for term in ['description', 'desc', 'summary']))
-                price_elem = product.find(class_=lambda x: x and any(term in x.lower() for term in ['price', 'cost']))
                 
-                if title_elem or desc_elem:
-                    product_data = {
-                        'title': title_elem.get_text().strip() if title_elem else '',
-                        'description': desc_elem.get_text().strip() if desc_elem else '',
-                        'price': price_elem.get_text().strip() if price_elem else '',
-                        'buttonText': [btn.get_text().strip() for btn in product.find_all(['button', 'a']) if btn.get_text().strip()],
-                        'className': product.get('class', [''])[0] if product.get('class') else ''
-                    }
-                    if product_data['title'] or product_data['description']:
-                        text_content['productContent'].append(product_data)
-            
-            # Extract hero/banner content
-            hero_selectors = soup.find_all(class_=lambda x: x and any(term in x.lower() for term in ['hero', 'banner', 'jumbotron']))
-            for hero in hero_selectors:
-                title_elem = hero.find(['h1', 'h2']) or hero.find(class_=lambda x: x and any(term in x.lower() for term in ['title', 'headline']))
-                subtitle_elem = hero.find(['h3', 'h4', 'p']) or hero.find(class_=lambda x: x and any(term in x.lower() for term in ['subtitle', 'subheading']))
-                
-                if title_elem or subtitle_elem:
-                    hero_data = {
-                        'title': title_elem.get_text().strip() if title_elem else '',
-                        'subtitle': subtitle_elem.get_text().strip() if subtitle_elem else '',
-                        'ctaText': [btn.get_text().strip() for btn in hero.find_all(['button', 'a']) if btn.get_text().strip()],
-                        'className': hero.get('class', [''])[0] if hero.get('class') else ''
-                    }
-                    if hero_data['title'] or hero_data['subtitle']:
-                        text_content['heroContent'].append(hero_data)
-            
-            # Extract section content
-            sections = soup.find_all(['section', 'article']) + soup.find_all(class_=lambda x: x and 'section' in x.lower())
-            for section in sections:
-                heading_elem = section.find(['h1', 'h2', 'h3']) or section.find(class_=lambda x: x and any(term in x.lower() for term in ['title', 'heading']))
-                content_elem = section.find('p') or section.find(class_=lambda x: x and any(term in x.lower() for term in ['description', 'text', 'content']))
+                # Extract button and CTA text
+                elif name == 'button' or name == 'input':
+                    if name == 'input' and elem.get('type') in ['button', 'submit']:
+                        btn_text = elem.get('value', '').strip()
+                    else:
+                        btn_text = elem.get_text().strip()
+                    
+                    if btn_text:
+                        text_content['buttonTexts'].append({
+                            'text': btn_text,
+                            'type': name,
+                            'className': first_class
+                        })
                 
-                if heading_elem or content_elem:
-                    section_data = {
-                        'heading': heading_elem.get_text().strip() if heading_elem else '',
-                        'content': content_elem.get_text().strip()[:200] if content_elem else '',
-                        'className': section.get('class', [''])[0] if section.get('class') else ''
-                    }
-                    if section_data['heading'] or section_data['content']:
-                        text_content['sectionContent'].append(section_data)
-            
-            # Extract footer content
-            footer_elements = soup.find_all('footer') + soup.find_all(class_=['footer'])
-            for footer in footer_elements:
-                footer_data = {
-                    'links': [a.get_text().strip() for a in footer.find_all('a') if a.get_text().strip()],
-                    'text': [el.get_text().strip() for el in footer.find_all(['p', 'span', 'div']) if el.get_text().strip() and len(el.get_text().strip()) < 100],
-                    'className': footer.get('class', [''])[0] if footer.get('class') else ''
-                }
-                if footer_data['links'] or footer_data['text']:
-                    text_content['footerContent'].append(footer_data)
-            
-            # Extract all visible text elements
-            for tag in ['p', 'span', 'div', 'li', 'a']:
-                for elem in soup.find_all(tag):
+                # Extract all visible text elements (within the allText budget), plus links and CTA links
+                collect_text = name in _TEXT_TAGS and text_tag_counts[name] < _MAX_TEXT_ITEMS_PER_TAG
+                if collect_text or name == 'a':
                     elem_text = elem.get_text().strip()
-                    if elem_text and len(elem_text) < 500 and len(elem_text) > 0:
-                        text_content['allText'].append({
-                            'tagName': tag,
+                    # Wrappers repeat their only child's text; keep just the first copy
+                    if collect_text and elem_text and len(elem_text) < 500 and elem_text != last_text:
+                        all_text.append({
+                            'tagName': name,
                             'text': elem_text,
-                            'className': elem.get('class', [''])[0] if elem.get('class') else '',
+                            'className': first_class,
                             'id': elem.get('id', '')
                         })
-
-            # Basic article extraction for Hacker News
-            articles = []
-            for tr in soup.find_all('tr', class_='athing'):
-                title_link = tr.find('a', class_='storylink') or tr.find('a', class_='titleline')
-                if title_link:
-                    href = title_link.get('href', '')
-                    if href.startswith('/'):
-                        href = urljoin(url, href)
+                        text_tag_counts[name] += 1
+                        last_text = elem_text
                     
-                    articles.append({
-                        'index': len(articles) + 1,
-                        'title': title_link.get_text().strip(),
-                        'href': href,
-                        'score': '',
-                        'author': '',
-                        'time': '',
-                        'comments': '',
-                        'className': tr.get('class', [''])[0] if tr.get('class') else '',
-                        'id': tr.get('id', '')
-                    })
-            
-            # Extract comprehensive text content for fallback method
-            text_content = {
-                'buttonTexts': [],
-                'navigationText': [],
-                'productContent': [],
-                'heroContent': [],
-                'sectionContent': [],
-                'footerContent': [],
-                'allText': []
-            }
-            
-            # Extract button and CTA text
-            for button in soup.find_all(['button', 'input']):
-                btn_text = ''
-                if button.name == 'input' and button.get('type') in ['button', 'submit']:
-                    btn_text = button.get('value', '').strip()
-                else:
-                    btn_text = button.get_text().strip()
+                    if name == 'a':
+                        href = elem.get('href')
+                        if href is not None:
+                            links.append({
+                                'text': elem_text,
+                                'href': _resolve_root_relative(href, base.scheme, base_prefix),
+                                'className': first_class
+                            })
+                        
+                        if _CTA_RE.search(elem_text):
+                            text_content['buttonTexts'].append({
+                                'text': elem_text,
+                                'type': 'a',
+                                'className': first_class,
+                                'href': href or ''
+                            })
                 
-                if btn_text:
-                    text_content['buttonTexts'].append({
-                        'text': btn_text,
-                        'type': button.name,
-                        'className': button.get('class', [''])[0] if button.get('class') else ''
-                    })
-            
-            # Extract CTA links that look like buttons
-            for a in soup.find_all('a'):
-                link_text = a.get_text().strip().lower()
-                if any(keyword in link_text for keyword in ['learn more', 'buy', 'shop', 'get started', 'try', 'download', 'explore', 'discover', 'view', 'watch', 'order']):
-                    text_content['buttonTexts'].append({
-                        'text': a.get_text().strip(),
-                        'type': 'a',
-                        'className': a.get('class', [''])[0] if a.get('class') else '',
-                        'href': a.get('href', '')
-                    })
-            
-            # Extract navigation text
-            nav_elements = soup.find_all(['nav', 'header']) + soup.find_all(class_=['nav', 'navbar', 'navigation', 'menu'])
-            for nav in nav_elements:
-                for a in nav.find_all('a'):
-                    nav_text = a.get_text().strip()
-                    if nav_text:
-                        text_content['navigationText'].append({
-                            'text': nav_text,
-                            'href': a.get('href', ''),
-                            'className': a.get('class', [''])[0] if a.get('class') else ''
+                # Extract navigation text
+                if name == 'nav' or name == 'header' or _NAV_CLASSES.intersection(classes):
+                    for a in elem.find_all('a'):
+                        nav_text = a.get_text().strip()
+                        if nav_text:
+                            text_content['navigationText'].append({
+                                'text': nav_text,
+                                'href': a.get('href', ''),
+                                'className': _first_class(a)
+                            })
+                
+                if not class_text and name not in ('section', 'article', 'footer'):
+                    continue
+                
+                # Basic article extraction for Hacker News
+                if name == 'tr' and 'athing' in classes:
+                    title_link = _STORY_LINK_SEL.select_one(elem)
+                    if title_link:
+                        articles.append({
+                            'index': len(articles) + 1,
+                            'title': title_link.get_text().strip(),
+                            'href': _resolve_root_relative(title_link.get('href', ''), base.scheme, base_prefix),
+                            'score': '',
+                            'author': '',
+                            'time': '',
+                            'comments': '',
+                            'className': first_class,
+                            'id': elem.get('id', '')
                         })
+                
+                # Extract product content
+                if _PRODUCT_CLASS_RE.search(class_text):
+                    title_elem = elem.find(['h1', 'h2', 'h3']) or _TITLE_OR_NAME_SEL.select_one(elem)
+                    desc_elem = elem.find('p') or _DESCRIPTION_SEL.select_one(elem)
+                    price_elem = _PRICE_SEL.select_one(elem)
+                    
+                    if title_elem or desc_elem:
+                        product_data = {
+                            'title': title_elem.get_text().strip() if title_elem else '',
+                            'description': desc_elem.get_text().strip() if desc_elem else '',
+                            'price': price_elem.get_text().strip() if price_elem else '',
+                            'buttonText': _texts(elem.find_all(['button', 'a'])),
+                            'className': first_class
+                        }
+                        if product_data['title'] or product_data['description']:
+                            text_content['productContent'].append(product_data)
+                
+                # Extract hero/banner content
+                if _HERO_CLASS_RE.search(class_text):
+                    title_elem = elem.find(['h1', 'h2']) or _HEADLINE_SEL.select_one(elem)
+                    subtitle_elem = elem.find(['h3', 'h4', 'p']) or _SUBHEADING_SEL.select_one(elem)
+                    
+                    if title_elem or subtitle_elem:
+                        hero_data = {
+                            'title': title_elem.get_text().strip() if title_elem else '',
+                            'subtitle': subtitle_elem.get_text().strip() if subtitle_elem else '',
+                            'ctaText': _texts(elem.find_all(['button', 'a'])),
+                            'className': first_class
+                        }
+                        if hero_data['title'] or hero_data['subtitle']:
+                            text_content['heroContent'].append(hero_data)
+                
+                # Extract section content
+                if name == 'section' or name == 'article' or _SECTION_CLASS_RE.search(class_text):
+                    heading_elem = elem.find(['h1', 'h2', 'h3']) or _HEADING_SEL.select_one(elem)
+                    content_elem = elem.find('p') or _CONTENT_SEL.select_one(elem)
+                    
+                    if heading_elem or content_elem:
+                        section_data = {
+                            'heading': heading_elem.get_text().strip() if heading_elem else '',
+                            'content': content_elem.get_text().strip()[:200] if content_elem else '',
+                            'className': first_class
+                        }
+                        if section_data['heading'] or section_data['content']:
+                            text_content['sectionContent'].append(section_data)
+                
+                # Extract footer content
+                if name == 'footer' or 'footer' in classes:
+                    footer_data = {
+                        'links': _texts(elem.find_all('a')),
+                        'text': [text for text in _texts(elem.find_all(['p', 'span', 'div'])) if len(text) < 100],
+                        'className': first_class
+                    }
+                    if footer_data['links'] or footer_data['text']:
+                        text_content['footerContent'].append(footer_data)
+            
+            # Keep the most informative allText entries, still in document order
+            if len(all_text) > _MAX_TEXT_ITEMS:
+                keep = heapq.nlargest(_MAX_TEXT_ITEMS, range(len(all_text)),
+                                      key=lambda i: (_text_score(all_text[i]['text']), -i))
+                keep.sort()
+                text_content['allText'] = [all_text[i] for i in keep]
             
             return {
-                'html': str(soup),
+                'html': html,
                 'headings': headings,
                 'links': links,
                 'articles': articles,
@@ -706,545 +1038,7 @@ class WebsiteScraper:
     async def _extract_page_data(self, page) -> dict:
         """Extract comprehensive page data using JavaScript execution"""
         try:
-            return await page.evaluate("""
-                () => {
-                    const data = {
-                        html: document.documentElement.outerHTML,
-                        headings: Array.from(document.querySelectorAll("h1, h2, h3, h4, h5, h6")).map(h => ({ 
-                            level: parseInt(h.tagName.substr(1)), 
-                            text: h.textContent.trim(),
-                            className: h.className || ''
-                        })),
-                        links: Array.from(document.querySelectorAll("a")).map(a => ({ 
-                            text: a.textContent.trim(), 
-                            href: a.href,
-                            className: a.className || ''
-                        })),
-                        
-                        // Enhanced content extraction for Hacker News
-                        articles: Array.from(document.querySelectorAll('tr.athing')).map((article, index) => {
-                            const titleEl = article.querySelector('a.storylink') || article.querySelector('.titleline a');
-                            const nextRow = article.nextElementSibling;
-                            
-                            let scoreEl, authorEl, timeEl, commentsEl;
-                            if (nextRow && nextRow.querySelector('.subtext')) {
-                                scoreEl = nextRow.querySelector('.score');
-                                authorEl = nextRow.querySelector('.hnuser') || nextRow.querySelector('a[href*="user"]');
-                                timeEl = nextRow.querySelector('.age') || nextRow.querySelector('a[href*="item"]');
-                                commentsEl = nextRow.querySelector('a[href*="item"]:last-child');
-                            }
-                            
-                            const siteEl = article.querySelector('.sitestr') || article.querySelector('span.sitebit');
-                            
-                            let absoluteHref = '';
-                            if (titleEl && titleEl.href) {
-                                absoluteHref = titleEl.href.startsWith('http') 
-                                    ? titleEl.href 
-                                    : new URL(titleEl.href, window.location.href).href;
-                            }
-                            
-                            return {
-                                index: index + 1,
-                                title: titleEl ? titleEl.textContent.trim() : '',
-                                href: absoluteHref,
-                                score: scoreEl ? scoreEl.textContent.trim() : '',
-                                author: authorEl ? authorEl.textContent.trim() : '',
-                                time: timeEl ? timeEl.textContent.trim() : '',
-                                comments: commentsEl ? commentsEl.textContent.trim() : '',
-                                source: siteEl ? siteEl.textContent.trim() : '',
-                                className: article.className || '',
-                                id: article.id || ''
-                            };
-                        }).filter(item => item.title && item.title.length > 0),
-                        
-                        // Generic articles for other sites
-                        genericArticles: Array.from(document.querySelectorAll('.story, .item, article, .post, .entry, .news-item, [class*="story"], [class*="item"], [class*="post"]')).map((article, index) => {
-                            const titleEl = article.querySelector('h1, h2, h3, .title, a') || article.querySelector('a');
-                            
-                            let absoluteHref = '';
-                            if (titleEl && titleEl.href) {
-                                absoluteHref = titleEl.href.startsWith('http') 
-                                    ? titleEl.href 
-                                    : new URL(titleEl.href, window.location.href).href;
-                            }
-                            
-                            return {
-                                index: index + 1,
-                                title: titleEl ? titleEl.textContent.trim() : '',
-                                href: absoluteHref,
-                                text: article.textContent.trim().substring(0, 200)
-                            };
-                        }).filter(item => item.title && item.title.length > 0),
-                        
-                        navigation: {
-                            headerLinks: Array.from(document.querySelectorAll('header a, .header a, nav a, .nav a, .navbar a')).map(a => ({
-                                text: a.textContent.trim(),
-                                href: a.href,
-                                absoluteHref: new URL(a.href, window.location.href).href,
-                                isExternal: a.href.startsWith('http') && !a.href.includes(window.location.hostname),
-                                className: a.className || '',
-                                style: {
-                                    color: window.getComputedStyle(a).color,
-                                    fontSize: window.getComputedStyle(a).fontSize,
-                                    fontWeight: window.getComputedStyle(a).fontWeight,
-                                    textDecoration: window.getComputedStyle(a).textDecoration,
-                                    padding: window.getComputedStyle(a).padding,
-                                    margin: window.getComputedStyle(a).margin
-                                },
-                                parentElement: a.parentElement?.tagName.toLowerCase() || '',
-                                position: a.getBoundingClientRect()
-                            })),
-                            
-                            // Enhanced navigation structure analysis
-                            headerStructure: {
-                                headerElement: document.querySelector('header, .header, nav, .nav, .navbar')?.tagName.toLowerCase() || '',
-                                headerClass: document.querySelector('header, .header, nav, .nav, .navbar')?.className || '',
-                                headerStyle: document.querySelector('header, .header, nav, .nav, .navbar') ? {
-                                    backgroundColor: window.getComputedStyle(document.querySelector('header, .header, nav, .nav, .navbar')).backgroundColor,
-                                    height: window.getComputedStyle(document.querySelector('header, .header, nav, .nav, .navbar')).height,
-                                    padding: window.getComputedStyle(document.querySelector('header, .header, nav, .nav, .navbar')).padding,
-                                    display: window.getComputedStyle(document.querySelector('header, .header, nav, .nav, .navbar')).display,
-                                    justifyContent: window.getComputedStyle(document.querySelector('header, .header, nav, .nav, .navbar')).justifyContent,
-                                    alignItems: window.getComputedStyle(document.querySelector('header, .header, nav, .nav, .navbar')).alignItems,
-                                    flexDirection: window.getComputedStyle(document.querySelector('header, .header, nav, .nav, .navbar')).flexDirection
-                                } : {},
-                                logoPosition: document.querySelector('header img, .header img, nav img, .logo') ? 'left' : 'none',
-                                menuPosition: 'right',
-                                isSticky: window.getComputedStyle(document.querySelector('header, .header, nav, .nav, .navbar') || document.body).position === 'fixed' || 
-                                         window.getComputedStyle(document.querySelector('header, .header, nav, .nav, .navbar') || document.body).position === 'sticky'
-                            },
-                            sidebarLinks: Array.from(document.querySelectorAll('aside a, .sidebar a, .nav-sidebar a, [class*="sidebar"] a')).map(a => ({
-                                text: a.textContent.trim(),
-                                href: a.href,
-                                absoluteHref: new URL(a.href, window.location.href).href,
-                                isExternal: a.href.startsWith('http') && !a.href.includes(window.location.hostname),
-                                className: a.className || ''
-                            })),
-                            mainContentLinks: Array.from(document.querySelectorAll('main a, .main a, .content a, article a')).map(a => ({
-                                text: a.textContent.trim(),
-                                href: a.href,
-                                absoluteHref: new URL(a.href, window.location.href).href,
-                                isExternal: a.href.startsWith('http') && !a.href.includes(window.location.hostname),
-                                className: a.className || ''
-                            }))
-                        },
-                        
-                        layout: {
-                            hasFixedHeader: !!document.querySelector('header[style*="fixed"], .header[style*="fixed"], nav[style*="fixed"]'),
-                            hasSidebar: !!document.querySelector('aside, .sidebar, .nav-sidebar, [class*="sidebar"]'),
-                            isResponsive: !!document.querySelector('meta[name="viewport"]'),
-                            gridContainers: Array.from(document.querySelectorAll('*')).filter(el => 
-                                window.getComputedStyle(el).display === 'grid'
-                            ).length,
-                            flexContainers: Array.from(document.querySelectorAll('*')).filter(el => 
-                                window.getComputedStyle(el).display === 'flex'
-                            ).length,
-                            hasTopNav: !!document.querySelector('header, .header, .top-nav, .navbar'),
-                            hasMainContent: !!document.querySelector('main, .main, .content'),
-                            hasSectionDividers: !!document.querySelector('hr, .divider, .separator, [class*="divider"], [class*="separator"]'),
-                            hasProductCards: !!document.querySelector('.product, .card, .item-card, [class*="product"], [class*="card"]'),
-                            hasHeroBanner: !!document.querySelector('.hero, .banner, .jumbotron, [class*="hero"], [class*="banner"]')
-                        },
-                        
-                        // Extract product cards and featured items
-                        productCards: Array.from(document.querySelectorAll('.product, .card, .item-card, [class*="product"], [class*="card"], .tile, [class*="tile"]')).map(card => ({
-                            title: (card.querySelector('h1, h2, h3, h4, .title, .name, [class*="title"], [class*="name"]') || {}).textContent?.trim() || '',
-                            description: (card.querySelector('p, .description, .desc, [class*="description"], [class*="desc"]') || {}).textContent?.trim() || '',
-                            image: (card.querySelector('img') || {}).src || '',
-                            link: (card.querySelector('a') || {}).href || '',
-                            className: card.className || '',
-                            price: (card.querySelector('.price, [class*="price"]') || {}).textContent?.trim() || ''
-                        })).filter(item => item.title || item.image),
-                        
-                        // Extract section dividers and separators
-                        dividers: Array.from(document.querySelectorAll('hr, .divider, .separator, [class*="divider"], [class*="separator"]')).map(div => ({
-                            tagName: div.tagName.toLowerCase(),
-                            className: div.className || '',
-                            style: div.style.cssText || '',
-                            computedStyle: {
-                                borderTop: window.getComputedStyle(div).borderTop,
-                                borderBottom: window.getComputedStyle(div).borderBottom,
-                                backgroundColor: window.getComputedStyle(div).backgroundColor,
-                                height: window.getComputedStyle(div).height,
-                                margin: window.getComputedStyle(div).margin
-                            }
-                        })),
-                        
-                        // COMPREHENSIVE TEXT CONTENT EXTRACTION
-                        textContent: {
-                            // Extract all visible text elements with complete color information
-                            allText: Array.from(document.querySelectorAll('p, span, div, li, h1, h2, h3, h4, h5, h6, a, button, .text, .content, .description, .title, .subtitle, .caption, .label, .price, .product-name, .product-title')).map(el => {
-                                const computedStyle = window.getComputedStyle(el);
-                                return {
-                                    tagName: el.tagName.toLowerCase(),
-                                    text: el.textContent?.trim() || '',
-                                    className: el.className || '',
-                                    id: el.id || '',
-                                    context: el.closest('.product, .card, .hero, .banner, section, article, .content, nav, header, footer')?.className || '',
-                                    // Complete font and color information
-                                    styles: {
-                                        fontFamily: computedStyle.fontFamily,
-                                        fontSize: computedStyle.fontSize,
-                                        fontWeight: computedStyle.fontWeight,
-                                        letterSpacing: computedStyle.letterSpacing,
-                                        lineHeight: computedStyle.lineHeight,
-                                        textAlign: computedStyle.textAlign,
-                                        textDecoration: computedStyle.textDecoration,
-                                        // Color information
-                                        color: computedStyle.color,
-                                        backgroundColor: computedStyle.backgroundColor,
-                                        // Parent background for context
-                                        parentBackgroundColor: el.parentElement ? window.getComputedStyle(el.parentElement).backgroundColor : 'transparent',
-                                        // Contrast context
-                                        isOnDarkBackground: (() => {
-                                            const bgColor = computedStyle.backgroundColor;
-                                            const parentBg = el.parentElement ? window.getComputedStyle(el.parentElement).backgroundColor : 'transparent';
-                                            const isColorDark = (color) => {
-                                                if (!color || color === 'transparent' || color === 'rgba(0, 0, 0, 0)') return false;
-                                                const rgb = color.match(/\\d+/g);
-                                                if (!rgb) return false;
-                                                const brightness = (parseInt(rgb[0]) * 299 + parseInt(rgb[1]) * 587 + parseInt(rgb[2]) * 114) / 1000;
-                                                return brightness < 128;
-                                            };
-                                            return isColorDark(bgColor) || isColorDark(parentBg);
-                                        })(),
-                                        // Text role classification
-                                        textRole: (() => {
-                                            if (el.closest('nav, header, .navbar')) return 'navigation';
-                                            if (el.closest('button, .btn')) return 'button';
-                                            if (el.tagName.match(/H[1-6]/)) return 'heading';
-                                            if (el.closest('.price, [class*="price"]')) return 'price';
-                                            if (el.closest('.product, [class*="product"]')) return 'product';
-                                            if (el.closest('footer')) return 'footer';
-                                            return 'content';
-                                        })(),
-                                        // Semantic context
-                                        semanticContext: (() => {
-                                            const contexts = [];
-                                            if (el.closest('.hero, .banner')) contexts.push('hero');
-                                            if (el.closest('.product, .item')) contexts.push('product');
-                                            if (el.closest('.cta, .call-to-action')) contexts.push('cta');
-                                            if (el.closest('nav, header')) contexts.push('navigation');
-                                            if (el.closest('footer')) contexts.push('footer');
-                                            return contexts.join(',') || 'general';
-                                        })()
-                                    },
-                                    position: el.getBoundingClientRect(),
-                                    isVisible: computedStyle.display !== 'none' && computedStyle.visibility !== 'hidden' && computedStyle.opacity !== '0'
-                                };
-                            }).filter(item => item.text && item.text.length > 0 && item.text.length < 500 && item.isVisible),
-                            
-                            // Extract comprehensive color palette from the website
-                            colorPalette: (() => {
-                                const colors = new Set();
-                                const elements = document.querySelectorAll('*');
-                                elements.forEach(el => {
-                                    const style = window.getComputedStyle(el);
-                                    if (style.color && style.color !== 'rgba(0, 0, 0, 0)') colors.add(style.color);
-                                    if (style.backgroundColor && style.backgroundColor !== 'rgba(0, 0, 0, 0)') colors.add(style.backgroundColor);
-                                    if (style.borderColor && style.borderColor !== 'rgba(0, 0, 0, 0)') colors.add(style.borderColor);
-                                });
-                                return Array.from(colors).slice(0, 50); // Limit to top 50 colors
-                            })(),
-                            
-                            // Navigation-specific color extraction
-                            navigationColors: Array.from(document.querySelectorAll('nav, header, .navbar, .navigation, .menu')).map(nav => {
-                                const computedStyle = window.getComputedStyle(nav);
-                                return {
-                                    element: nav.tagName.toLowerCase(),
-                                    className: nav.className || '',
-                                    backgroundColor: computedStyle.backgroundColor,
-                                    textColor: computedStyle.color,
-                                    linkColors: Array.from(nav.querySelectorAll('a')).map(link => ({
-                                        text: link.textContent?.trim() || '',
-                                        color: window.getComputedStyle(link).color,
-                                        hoverColor: link.getAttribute('data-hover-color') || 'inherit',
-                                        className: link.className || ''
-                                    })),
-                                    borderColor: computedStyle.borderColor,
-                                    boxShadow: computedStyle.boxShadow
-                                };
-                            }),
-                            
-                            // Button-specific color extraction
-                            buttonColors: Array.from(document.querySelectorAll('button, .btn, .button, input[type="button"], input[type="submit"], a[class*="btn"]')).map(btn => {
-                                const computedStyle = window.getComputedStyle(btn);
-                                return {
-                                    text: btn.textContent?.trim() || btn.value || '',
-                                    type: btn.tagName.toLowerCase(),
-                                    className: btn.className || '',
-                                    colors: {
-                                        textColor: computedStyle.color,
-                                        backgroundColor: computedStyle.backgroundColor,
-                                        borderColor: computedStyle.borderColor,
-                                        hoverTextColor: btn.getAttribute('data-hover-text-color') || computedStyle.color,
-                                        hoverBackgroundColor: btn.getAttribute('data-hover-bg-color') || computedStyle.backgroundColor
-                                    },
-                                    styles: {
-                                        padding: computedStyle.padding,
-                                        borderRadius: computedStyle.borderRadius,
-                                        fontSize: computedStyle.fontSize,
-                                        fontWeight: computedStyle.fontWeight
-                                    },
-                                    context: btn.closest('.product, .card, .hero, .banner, section, article, nav, header, footer')?.className || ''
-                                };
-                            }).filter(item => item.text),
-                            
-                            // Heading-specific color extraction
-                            headingColors: Array.from(document.querySelectorAll('h1, h2, h3, h4, h5, h6')).map(heading => {
-                                const computedStyle = window.getComputedStyle(heading);
-                                return {
-                                    level: parseInt(heading.tagName.substring(1)),
-                                    text: heading.textContent?.trim() || '',
-                                    className: heading.className || '',
-                                    colors: {
-                                        textColor: computedStyle.color,
-                                        backgroundColor: computedStyle.backgroundColor
-                                    },
-                                    styles: {
-                                        fontSize: computedStyle.fontSize,
-                                        fontWeight: computedStyle.fontWeight,
-                                        lineHeight: computedStyle.lineHeight,
-                                        marginTop: computedStyle.marginTop,
-                                        marginBottom: computedStyle.marginBottom
-                                    },
-                                    context: heading.closest('.product, .card, .hero, .banner, section, article')?.className || ''
-                                };
-                            }).filter(item => item.text),
-                            
-                            // Product names and descriptions
-                            productContent: Array.from(document.querySelectorAll('.product, .item, [class*="product"], [class*="item"]')).map(product => ({
-                                title: product.querySelector('h1, h2, h3, .title, .name, .product-name, .product-title')?.textContent?.trim() || '',
-                                description: product.querySelector('p, .description, .desc, .summary, .details')?.textContent?.trim() || '',
-                                price: product.querySelector('.price, .cost, [class*="price"], [class*="cost"]')?.textContent?.trim() || '',
-                                buttonText: Array.from(product.querySelectorAll('button, .btn, .button, a[class*="btn"]')).map(btn => btn.textContent?.trim()).filter(text => text),
-                                className: product.className || '',
-                                id: product.id || ''
-                            })).filter(item => item.title || item.description),
-                            
-                            // Navigation and menu text
-                            navigationText: Array.from(document.querySelectorAll('nav a, header a, .menu a, .navbar a, .navigation a')).map(link => ({
-                                text: link.textContent?.trim() || '',
-                                href: link.href || '',
-                                className: link.className || '',
-                                parentContext: link.closest('nav, header, .menu, .navbar')?.className || ''
-                            })).filter(item => item.text),
-                            
-                            // Hero/banner text content
-                            heroContent: Array.from(document.querySelectorAll('.hero, .banner, .jumbotron, [class*="hero"], [class*="banner"]')).map(hero => ({
-                                title: hero.querySelector('h1, h2, .title, .headline')?.textContent?.trim() || '',
-                                subtitle: hero.querySelector('h3, h4, .subtitle, .subheading, p')?.textContent?.trim() || '',
-                                ctaText: Array.from(hero.querySelectorAll('button, .btn, .cta, a[class*="btn"]')).map(btn => btn.textContent?.trim()).filter(text => text),
-                                className: hero.className || ''
-                            })).filter(item => item.title || item.subtitle),
-                            
-                            // All button and CTA text
-                            buttonTexts: Array.from(document.querySelectorAll('button, .btn, .button, .cta, input[type="button"], input[type="submit"], a[class*="btn"], a[class*="button"]')).map(btn => ({
-                                text: btn.textContent?.trim() || btn.value || btn.alt || '',
-                                type: btn.tagName.toLowerCase(),
-                                className: btn.className || '',
-                                href: btn.href || '',
-                                context: btn.closest('.product, .card, .hero, section, article')?.className || ''
-                            })).filter(item => item.text),
-                            
-                            // Section headings and content
-                            sectionContent: Array.from(document.querySelectorAll('section, article, .section, .content-section')).map(section => ({
-                                heading: section.querySelector('h1, h2, h3, .title, .heading')?.textContent?.trim() || '',
-                                content: section.querySelector('p, .description, .text, .content')?.textContent?.trim().substring(0, 200) || '',
-                                className: section.className || '',
-                                id: section.id || ''
-                            })).filter(item => item.heading || item.content),
-                            
-                            // Footer text
-                            footerContent: Array.from(document.querySelectorAll('footer, .footer')).map(footer => ({
-                                links: Array.from(footer.querySelectorAll('a')).map(link => link.textContent?.trim()).filter(text => text),
-                                text: Array.from(footer.querySelectorAll('p, span, div')).map(el => el.textContent?.trim()).filter(text => text && text.length < 100),
-                                className: footer.className || ''
-                            })).filter(item => item.links.length > 0 || item.text.length > 0)
-                        },
-                        
-                        // Extract images with their attributes
-                        images: Array.from(document.querySelectorAll('img')).map(img => ({
-                            src: img.src.startsWith('http') ? img.src : new URL(img.src, window.location.href).href,
-                            alt: img.alt || '',
-                            width: img.width || img.naturalWidth || '',
-                            height: img.height || img.naturalHeight || '',
-                            className: img.className || '',
-                            id: img.id || '',
-                            loading: img.loading || '',
-                            srcset: img.srcset || '',
-                            sizes: img.sizes || '',
-                            title: img.title || '',
-                            style: img.style.cssText || ''
-                        })).filter(img => img.src && !img.src.startsWith('data:')),
-                        
-                        // Extract background images from CSS
-                        backgroundImages: Array.from(document.querySelectorAll('*')).map(el => {
-                            const style = window.getComputedStyle(el);
-                            const bgImage = style.backgroundImage;
-                            if (bgImage && bgImage !== 'none' && bgImage.includes('url(')) {
-                                const match = bgImage.match(/url\\(["']?([^"']+)["']?\\)/);
-                                const imageUrl = match ? match[1] : bgImage;
-                                // Convert relative URLs to absolute
-                                const absoluteUrl = imageUrl.startsWith('http') ? imageUrl : new URL(imageUrl, window.location.href).href;
-                                return {
-                                    element: el.tagName.toLowerCase(),
-                                    className: el.className || '',
-                                    id: el.id || '',
-                                    backgroundImage: absoluteUrl,
-                                    backgroundSize: style.backgroundSize,
-                                    backgroundPosition: style.backgroundPosition,
-                                    backgroundRepeat: style.backgroundRepeat
-                                };
-                            }
-                            return null;
-                        }).filter(item => item !== null),
-                        
-                        // Extract logo and brand images with enhanced Apple-specific detection
-                        logoImages: Array.from(document.querySelectorAll('img[alt*="logo" i], img[class*="logo" i], img[id*="logo" i], .logo img, .brand img, header img, nav img, .globalnav img, img[src*="apple"], img[alt*="apple" i]')).map(img => ({
-                            src: img.src.startsWith('http') ? img.src : new URL(img.src, window.location.href).href,
-                            alt: img.alt || '',
-                            className: img.className || '',
-                            id: img.id || '',
-                            width: img.width || img.naturalWidth || '',
-                            height: img.height || img.naturalHeight || '',
-                            parentElement: img.parentElement?.tagName.toLowerCase() || '',
-                            parentClass: img.parentElement?.className || '',
-                            // Enhanced Apple logo detection
-                            isAppleLogo: img.alt.toLowerCase().includes('apple') || img.src.includes('apple') || img.className.includes('apple'),
-                            hasValidSrc: img.src && !img.src.startsWith('data:') && img.src.length > 10,
-                            naturalDimensions: {
-                                width: img.naturalWidth || 0,
-                                height: img.naturalHeight || 0
-                            }
-                        })).filter(logo => logo.hasValidSrc),
-                        
-                        // Extract fonts and typography information with Apple-specific detection
-                        fonts: {
-                            bodyFont: window.getComputedStyle(document.body).fontFamily,
-                            headingFonts: Array.from(document.querySelectorAll('h1, h2, h3, h4, h5, h6')).map(h => ({
-                                tag: h.tagName.toLowerCase(),
-                                fontFamily: window.getComputedStyle(h).fontFamily,
-                                fontSize: window.getComputedStyle(h).fontSize,
-                                fontWeight: window.getComputedStyle(h).fontWeight,
-                                color: window.getComputedStyle(h).color,
-                                letterSpacing: window.getComputedStyle(h).letterSpacing,
-                                lineHeight: window.getComputedStyle(h).lineHeight,
-                                textContent: h.textContent.trim().substring(0, 50)
-                            })),
-                            navigationFonts: Array.from(document.querySelectorAll('nav a, header a, .globalnav a')).map(a => ({
-                                fontFamily: window.getComputedStyle(a).fontFamily,
-                                fontSize: window.getComputedStyle(a).fontSize,
-                                fontWeight: window.getComputedStyle(a).fontWeight,
-                                color: window.getComputedStyle(a).color,
-                                letterSpacing: window.getComputedStyle(a).letterSpacing,
-                                lineHeight: window.getComputedStyle(a).lineHeight,
-                                textContent: a.textContent.trim()
-                            })),
-                            primaryFonts: Array.from(new Set(
-                                Array.from(document.querySelectorAll('*')).map(el => 
-                                    window.getComputedStyle(el).fontFamily
-                                ).filter(font => font && font !== 'serif' && font !== 'sans-serif')
-                            )).slice(0, 10),
-                            // Detect Apple system fonts
-                            hasAppleFonts: Array.from(document.querySelectorAll('*')).some(el => {
-                                const font = window.getComputedStyle(el).fontFamily.toLowerCase();
-                                return font.includes('sf pro') || font.includes('-apple-system') || font.includes('helvetica neue');
-                            })
-                        },
-                        
-                        // Extract interactive buttons and CTAs with enhanced styling
-                        buttons: Array.from(document.querySelectorAll('button, .btn, .button, input[type="button"], input[type="submit"], a[class*="btn"], a[class*="button"], .cta, [class*="cta"]')).map(btn => ({
-                            tagName: btn.tagName.toLowerCase(),
-                            text: btn.textContent?.trim() || btn.value || btn.alt || '',
-                            className: btn.className || '',
-                            id: btn.id || '',
-                            href: btn.href || '',
-                            type: btn.type || '',
-                            ariaLabel: btn.getAttribute('aria-label') || '',
-                            style: {
-                                backgroundColor: window.getComputedStyle(btn).backgroundColor,
-                                color: window.getComputedStyle(btn).color,
-                                border: window.getComputedStyle(btn).border,
-                                borderRadius: window.getComputedStyle(btn).borderRadius,
-                                padding: window.getComputedStyle(btn).padding,
-                                margin: window.getComputedStyle(btn).margin,
-                                fontSize: window.getComputedStyle(btn).fontSize,
-                                fontWeight: window.getComputedStyle(btn).fontWeight,
-                                textTransform: window.getComputedStyle(btn).textTransform,
-                                textDecoration: window.getComputedStyle(btn).textDecoration,
-                                display: window.getComputedStyle(btn).display,
-                                alignItems: window.getComputedStyle(btn).alignItems,
-                                justifyContent: window.getComputedStyle(btn).justifyContent,
-                                boxShadow: window.getComputedStyle(btn).boxShadow,
-                                transition: window.getComputedStyle(btn).transition,
-                                cursor: window.getComputedStyle(btn).cursor,
-                                minWidth: window.getComputedStyle(btn).minWidth,
-                                height: window.getComputedStyle(btn).height,
-                                lineHeight: window.getComputedStyle(btn).lineHeight
-                            },
-                            boundingRect: btn.getBoundingClientRect(),
-                            isClickable: btn.onclick !== null || btn.href || btn.type === 'button' || btn.type === 'submit',
-                            parentContext: btn.closest('.card, .product, article, section, header, .hero, .banner')?.className || '',
-                            isAppleStyle: btn.textContent?.trim().toLowerCase().includes('learn more') || 
-                                         btn.textContent?.trim().toLowerCase().includes('buy') ||
-                                         btn.className.includes('more') || btn.className.includes('cta')
-                        })).filter(btn => btn.text || btn.href),
-                        
-                        // Extract call-to-action elements and links with Apple patterns
-                        ctaElements: Array.from(document.querySelectorAll('a')).filter(a => {
-                            const text = a.textContent?.trim().toLowerCase() || '';
-                            return text.includes('learn more') || text.includes('buy') || text.includes('shop') || 
-                                   text.includes('get started') || text.includes('try') || text.includes('download') ||
-                                   text.includes('explore') || text.includes('discover') || text.includes('view') ||
-                                   text.includes('watch') || text.includes('see') || text.includes('order');
-                        }).map(cta => ({
-                            text: cta.textContent?.trim() || '',
-                            href: cta.href.startsWith('http') ? cta.href : new URL(cta.href, window.location.href).href,
-                            className: cta.className || '',
-                            id: cta.id || '',
-                            ariaLabel: cta.getAttribute('aria-label') || '',
-                            style: {
-                                backgroundColor: window.getComputedStyle(cta).backgroundColor,
-                                color: window.getComputedStyle(cta).color,
-                                border: window.getComputedStyle(cta).border,
-                                borderRadius: window.getComputedStyle(cta).borderRadius,
-                                padding: window.getComputedStyle(cta).padding,
-                                margin: window.getComputedStyle(cta).margin,
-                                textDecoration: window.getComputedStyle(cta).textDecoration,
-                                fontWeight: window.getComputedStyle(cta).fontWeight,
-                                fontSize: window.getComputedStyle(cta).fontSize,
-                                display: window.getComputedStyle(cta).display,
-                                alignItems: window.getComputedStyle(cta).alignItems,
-                                justifyContent: window.getComputedStyle(cta).justifyContent,
-                                boxShadow: window.getComputedStyle(cta).boxShadow,
-                                transition: window.getComputedStyle(cta).transition,
-                                cursor: window.getComputedStyle(cta).cursor,
-                                lineHeight: window.getComputedStyle(cta).lineHeight,
-                                textTransform: window.getComputedStyle(cta).textTransform
-                            },
-                            boundingRect: cta.getBoundingClientRect(),
-                            parentContext: cta.closest('.card, .product, article, section, header, .hero, .banner')?.className || '',
-                            hasIcon: !!cta.querySelector('svg, i, .icon, [class*="icon"]'),
-                            isAppleButton: cta.textContent?.trim().toLowerCase() === 'learn more >' || 
-                                          cta.textContent?.trim().toLowerCase() === 'buy' ||
-                                          cta.className.includes('more') || cta.className.includes('button')
-                        })),
-
-                        colors: Array.from(new Set(Array.from(document.querySelectorAll("*")).map(el => 
-                            window.getComputedStyle(el).color
-                        ).filter(c => c && c !== "rgba(0, 0, 0, 0)"))).slice(0, 20),
-                        
-                        viewport: {
-                            width: window.innerWidth,
-                            height: window.innerHeight,
-                            documentHeight: document.documentElement.scrollHeight,
-                            documentWidth: document.documentElement.scrollWidth
-                        }
-                    };
-                    return data;
-                }
-            """)
+            return orjson.loads(await page.evaluate(_PAGE_DATA_SCRIPT))
         except Exception as e:
             logger.error(f"Failed to extract page data with JavaScript: {str(e)}")
             return {'html': '', 'headings': [], 'links': [], 'articles': []}
@@ -1252,8 +1046,912 @@ class WebsiteScraper:
     def _is_valid_url(self, url: str) -> bool:
         """Validate URL format"""
         try:
-            result = urlparse(url)
-            return all([result.scheme, result.netloc])
+            result = urlsplit(url)
+            # Browsers and the HTTP fallback can only fetch web URLs
+            return result.scheme in _URL_SCHEMES and bool(result.hostname)
         except Exception:
             return False
- 
\ No newline at end of file
+ 
+
+
+# In-page extraction script run by WebsiteScraper._extract_page_data. Built once at import;
+# a single evaluate per page keeps the shared element walk and style caches in one call.
+# It returns a JSON string, parsed with orjson on the Python side.
+_PAGE_DATA_SCRIPT = """
+() => {
+    // Several extractors read the same elements' computed style; fetch each declaration once
+    const styleCache = new WeakMap();
+    const cs = (el) => {
+        let style = styleCache.get(el);
+        if (!style) {
+            style = window.getComputedStyle(el);
+            styleCache.set(el, style);
+        }
+        return style;
+    };
+
+    // One walk over every element: computed-style counts, colors, fonts and background images,
+    // plus per-tag buckets reused below instead of re-querying the document for headings, links and images
+    const headingEls = [];
+    const anchorEls = [];
+    const imageEls = [];
+    let gridContainers = 0;
+    let flexContainers = 0;
+    const colorCounts = new Map();
+    const countColor = (color) => {
+        if (color && color !== 'rgba(0, 0, 0, 0)') colorCounts.set(color, (colorCounts.get(color) || 0) + 1);
+    };
+    // Only the first MAX_TEXT_COLORS distinct text colors are reported; stop adding once full
+    const MAX_TEXT_COLORS = 20;
+    const textColors = new Set();
+    const fontFamilies = new Set();
+    const backgroundImages = [];
+    const seenBackgrounds = new Set();
+    const BACKGROUND_URL_RE = /url\\(["']?([^"']+)["']?\\)/;
+    const pageUrl = window.location.href;
+    const allElements = document.getElementsByTagName('*');
+    for (let i = 0; i < allElements.length; i++) {
+        const el = allElements[i];
+        switch (el.localName) {
+            case 'h1': case 'h2': case 'h3': case 'h4': case 'h5': case 'h6':
+                headingEls.push(el);
+                break;
+            case 'a':
+                anchorEls.push(el);
+                break;
+            case 'img':
+                imageEls.push(el);
+                break;
+        }
+        const style = cs(el);
+        const display = style.display;
+        if (display === 'grid') gridContainers++;
+        else if (display === 'flex') flexContainers++;
+        const color = style.color;
+        countColor(color);
+        countColor(style.backgroundColor);
+        countColor(style.borderColor);
+        if (textColors.size < MAX_TEXT_COLORS && color && color !== 'rgba(0, 0, 0, 0)') textColors.add(color);
+
+        const fontFamily = style.fontFamily;
+        if (fontFamily && fontFamily !== 'serif' && fontFamily !== 'sans-serif') fontFamilies.add(fontFamily);
+
+        // Extract background images from CSS
+        const bgImage = style.backgroundImage;
+        if (bgImage && bgImage !== 'none' && bgImage.includes('url(')) {
+            const match = BACKGROUND_URL_RE.exec(bgImage);
+            const imageUrl = match ? match[1] : bgImage;
+            // Convert relative URLs to absolute
+            const absoluteUrl = imageUrl.startsWith('http') ? imageUrl : new URL(imageUrl, pageUrl).href;
+            // Sprites and repeated section backgrounds share one URL; report each once
+            if (!seenBackgrounds.has(absoluteUrl)) {
+                seenBackgrounds.add(absoluteUrl);
+                backgroundImages.push({
+                    element: el.tagName.toLowerCase(),
+                    className: el.className || '',
+                    id: el.id || '',
+                    backgroundImage: absoluteUrl,
+                    backgroundSize: style.backgroundSize,
+                    backgroundPosition: style.backgroundPosition,
+                    backgroundRepeat: style.backgroundRepeat
+                });
+            }
+        }
+    }
+
+    // Button-like elements, queried once: buttons uses them all, buttonColors and buttonTexts
+    // keep the subsets their own selectors describe
+    const buttonEls = document.querySelectorAll('button, .btn, .button, input[type="button"], input[type="submit"], a[class*="btn"], a[class*="button"], .cta, [class*="cta"]');
+    const BUTTON_COLORS_SELECTOR = 'button, .btn, .button, input[type="button"], input[type="submit"], a[class*="btn"]';
+    const BUTTON_TEXTS_SELECTOR = 'button, .btn, .button, .cta, input[type="button"], input[type="submit"], a[class*="btn"], a[class*="button"]';
+
+    // Computed-style properties copied for buttons and CTA links, in output order
+    const BUTTON_STYLE_PROPS = ['backgroundColor', 'color', 'border', 'borderRadius', 'padding', 'margin', 'fontSize', 'fontWeight', 'textTransform', 'textDecoration', 'display', 'alignItems', 'justifyContent', 'boxShadow', 'transition', 'cursor', 'minWidth', 'height', 'lineHeight'];
+    const CTA_STYLE_PROPS = ['backgroundColor', 'color', 'border', 'borderRadius', 'padding', 'margin', 'textDecoration', 'fontWeight', 'fontSize', 'display', 'alignItems', 'justifyContent', 'boxShadow', 'transition', 'cursor', 'lineHeight', 'textTransform'];
+    const pickStyles = (el, props) => {
+        const style = cs(el);
+        const picked = {};
+        for (let i = 0; i < props.length; i++) picked[props[i]] = style[props[i]];
+        return picked;
+    };
+
+    // Caps on the larger lists so image- and button-heavy pages don't bloat the payload
+    const MAX_IMAGES = 200;
+    const MAX_BUTTONS = 200;
+    const MAX_SECTIONS = 100;
+    const MIN_IMAGE_SIZE = 16;
+
+    // Helpers shared by several extractors, defined once per evaluation
+    const isColorDark = (color) => {
+        if (!color || color === 'transparent' || color === 'rgba(0, 0, 0, 0)') return false;
+        const rgb = color.match(/\\d+/g);
+        if (!rgb) return false;
+        const brightness = (parseInt(rgb[0]) * 299 + parseInt(rgb[1]) * 587 + parseInt(rgb[2]) * 114) / 1000;
+        return brightness < 128;
+    };
+    const pageHostname = window.location.hostname;
+    // Headings, links and buttons appear in several lists; trim each element's text once
+    const textCache = new WeakMap();
+    const textOf = (el) => {
+        let text = textCache.get(el);
+        if (text === undefined) {
+            text = (el.textContent || '').trim();
+            textCache.set(el, text);
+        }
+        return text;
+    };
+    // Drop empty-string, null and empty-array fields from wide records (buttons, CTAs) before they cross the bridge
+    const compact = (item) => {
+        const out = {};
+        for (const key in item) {
+            const value = item[key];
+            if (value === '' || value == null || (Array.isArray(value) && value.length === 0)) continue;
+            out[key] = value;
+        }
+        return out;
+    };
+    
+    // Element box as [x, y, width, height]; right/bottom are derivable
+    const rectOf = (el) => {
+        const r = el.getBoundingClientRect();
+        return [r.x, r.y, r.width, r.height];
+    };
+
+    // Trimmed, non-empty text of each element under root matching selector
+    const textsOf = (root, selector) => {
+        const texts = [];
+        const nodes = root.querySelectorAll(selector);
+        for (let i = 0; i < nodes.length; i++) {
+            const text = nodes[i].textContent?.trim();
+            if (text) texts.push(text);
+        }
+        return texts;
+    };
+    const linkSummary = (a) => ({
+        text: textOf(a),
+        href: a.href,
+        absoluteHref: a.href,
+        isExternal: a.href.startsWith('http') && !a.href.includes(pageHostname),
+        className: a.className || ''
+    });
+
+    // Memoized closest(): every element on the path to the match (or the root) records the
+    // result, so ancestors shared by many elements are matched against the selector only once
+    const closestLookup = (selector) => {
+        const memo = new Map();
+        return (el) => {
+            const path = [];
+            let found = null;
+            for (let node = el; node; node = node.parentElement) {
+                if (memo.has(node)) {
+                    found = memo.get(node);
+                    break;
+                }
+                path.push(node);
+                if (node.matches(selector)) {
+                    found = node;
+                    break;
+                }
+            }
+            for (let i = 0; i < path.length; i++) memo.set(path[i], found);
+            return found;
+        };
+    };
+    const buttonContextOf = closestLookup('.product, .card, .hero, .banner, section, article, nav, header, footer');
+    const headingContextOf = closestLookup('.product, .card, .hero, .banner, section, article');
+    const navContextOf = closestLookup('nav, header, .menu, .navbar');
+    const buttonTextContextOf = closestLookup('.product, .card, .hero, section, article');
+    const parentContextOf = closestLookup('.card, .product, article, section, header, .hero, .banner');
+    const logoContainerOf = closestLookup('.logo, .brand, header, nav, .globalnav');
+
+    // CTA link phrases (substring match on lower-cased link text), compiled once
+    const CTA_TEXT_RE = /learn more|buy|shop|get started|try|download|explore|discover|view|watch|see|order/;
+    // Class-name substrings for the isAppleStyle / isAppleButton hints
+    const MORE_OR_CTA_CLASS_RE = /more|cta/;
+    const MORE_OR_BUTTON_CLASS_RE = /more|button/;
+
+    // Sort links into the header, sidebar, main-content and global-nav groups in one pass over the walked
+    // anchors; a link inside more than one region is listed in each, like the descendant selectors
+    const inHeaderOf = closestLookup('header, .header, nav, .nav, .navbar');
+    const inSidebarOf = closestLookup('aside, .sidebar, .nav-sidebar, [class*="sidebar"]');
+    const inMainOf = closestLookup('main, .main, .content, article');
+    const inGlobalNavOf = closestLookup('nav, header, .globalnav');
+    const headerAnchors = [];
+    const sidebarAnchors = [];
+    const mainAnchors = [];
+    const globalNavAnchors = [];
+    for (let i = 0; i < anchorEls.length; i++) {
+        const a = anchorEls[i];
+        const parent = a.parentElement;
+        if (!parent) continue;
+        if (inHeaderOf(parent)) headerAnchors.push(a);
+        if (inSidebarOf(parent)) sidebarAnchors.push(a);
+        if (inMainOf(parent)) mainAnchors.push(a);
+        if (inGlobalNavOf(parent)) globalNavAnchors.push(a);
+    }
+
+    // Resolve the header element and the header/body computed styles once for headerStructure and bodyFont
+    const headerEl = document.querySelector('header, .header, nav, .nav, .navbar');
+    const bodyStyle = cs(document.body);
+    const headerStyle = headerEl ? cs(headerEl) : bodyStyle;
+
+    const data = {
+        html: document.documentElement.outerHTML,
+        headings: (() => {
+            const items = [];
+            for (let i = 0; i < headingEls.length; i++) {
+                const h = headingEls[i];
+                items.push({
+                    level: parseInt(h.tagName.substr(1)),
+                    text: textOf(h),
+                    className: h.className || ''
+                });
+            }
+            return items;
+        })(),
+        links: (() => {
+            const items = [];
+            for (let i = 0; i < anchorEls.length; i++) {
+                const a = anchorEls[i];
+                items.push({
+                    text: textOf(a),
+                    href: a.href,
+                    className: a.className || ''
+                });
+            }
+            return items;
+        })(),
+
+        // Enhanced content extraction for Hacker News
+        articles: (() => {
+            const items = [];
+            const rows = document.querySelectorAll('tr.athing');
+            for (let i = 0; i < rows.length; i++) {
+                const article = rows[i];
+                const titleEl = article.querySelector('a.storylink') || article.querySelector('.titleline a');
+                const title = titleEl ? titleEl.textContent.trim() : '';
+                if (!title) continue;
+                const nextRow = article.nextElementSibling;
+
+                let scoreEl, authorEl, timeEl, commentsEl;
+                if (nextRow && nextRow.querySelector('.subtext')) {
+                    scoreEl = nextRow.querySelector('.score');
+                    authorEl = nextRow.querySelector('.hnuser') || nextRow.querySelector('a[href*="user"]');
+                    timeEl = nextRow.querySelector('.age') || nextRow.querySelector('a[href*="item"]');
+                    commentsEl = nextRow.querySelector('a[href*="item"]:last-child');
+                }
+
+                const siteEl = article.querySelector('.sitestr') || article.querySelector('span.sitebit');
+
+                // The href property is already resolved against the document base
+                const absoluteHref = titleEl.href || '';
+
+                items.push({
+                    index: i + 1,
+                    title: title,
+                    href: absoluteHref,
+                    score: scoreEl ? scoreEl.textContent.trim() : '',
+                    author: authorEl ? authorEl.textContent.trim() : '',
+                    time: timeEl ? timeEl.textContent.trim() : '',
+                    comments: commentsEl ? commentsEl.textContent.trim() : '',
+                    source: siteEl ? siteEl.textContent.trim() : '',
+                    className: article.className || '',
+                    id: article.id || ''
+                });
+            }
+            return items;
+        })(),
+
+        // Generic articles for other sites
+        genericArticles: (() => {
+            const items = [];
+            const nodes = document.querySelectorAll('.story, .item, article, .post, .entry, .news-item, [class*="story"], [class*="item"], [class*="post"]');
+            for (let i = 0; i < nodes.length; i++) {
+                const article = nodes[i];
+                const titleEl = article.querySelector('h1, h2, h3, .title, a') || article.querySelector('a');
+                const title = titleEl ? titleEl.textContent.trim() : '';
+                if (!title) continue;
+
+                // The href property is already resolved against the document base
+                const absoluteHref = titleEl.href || '';
+
+                items.push({
+                    index: i + 1,
+                    title: title,
+                    href: absoluteHref,
+                    text: article.textContent.trim().substring(0, 200)
+                });
+            }
+            return items;
+        })(),
+
+        navigation: {
+            headerLinks: headerAnchors.map(a => {
+                const style = cs(a);
+                return {
+                    text: textOf(a),
+                    href: a.href,
+                    absoluteHref: a.href,
+                    isExternal: a.href.startsWith('http') && !a.href.includes(pageHostname),
+                    className: a.className || '',
+                    style: {
+                        color: style.color,
+                        fontSize: style.fontSize,
+                        fontWeight: style.fontWeight,
+                        textDecoration: style.textDecoration,
+                        padding: style.padding,
+                        margin: style.margin
+                    },
+                    parentElement: a.parentElement?.tagName.toLowerCase() || '',
+                    position: rectOf(a)
+                };
+            }),
+
+            // Enhanced navigation structure analysis
+            headerStructure: {
+                headerElement: headerEl?.tagName.toLowerCase() || '',
+                headerClass: headerEl?.className || '',
+                headerStyle: headerEl ? {
+                    backgroundColor: headerStyle.backgroundColor,
+                    height: headerStyle.height,
+                    padding: headerStyle.padding,
+                    display: headerStyle.display,
+                    justifyContent: headerStyle.justifyContent,
+                    alignItems: headerStyle.alignItems,
+                    flexDirection: headerStyle.flexDirection
+                } : {},
+                logoPosition: document.querySelector('header img, .header img, nav img, .logo') ? 'left' : 'none',
+                menuPosition: 'right',
+                isSticky: headerStyle.position === 'fixed' || headerStyle.position === 'sticky'
+            },
+            sidebarLinks: sidebarAnchors.map(linkSummary),
+            mainContentLinks: mainAnchors.map(linkSummary)
+        },
+
+        layout: {
+            hasFixedHeader: !!document.querySelector('header[style*="fixed"], .header[style*="fixed"], nav[style*="fixed"]'),
+            hasSidebar: !!document.querySelector('aside, .sidebar, .nav-sidebar, [class*="sidebar"]'),
+            isResponsive: !!document.querySelector('meta[name="viewport"]'),
+            gridContainers: gridContainers,
+            flexContainers: flexContainers,
+            hasTopNav: !!document.querySelector('header, .header, .top-nav, .navbar'),
+            hasMainContent: !!document.querySelector('main, .main, .content'),
+            hasSectionDividers: !!document.querySelector('hr, .divider, .separator, [class*="divider"], [class*="separator"]'),
+            hasProductCards: !!document.querySelector('.product, .card, .item-card, [class*="product"], [class*="card"]'),
+            hasHeroBanner: !!document.querySelector('.hero, .banner, .jumbotron, [class*="hero"], [class*="banner"]')
+        },
+
+        // Extract product cards and featured items
+        productCards: (() => {
+            const items = [];
+            const nodes = document.querySelectorAll('.product, .card, .item-card, [class*="product"], [class*="card"], .tile, [class*="tile"]');
+            for (let i = 0; i < nodes.length; i++) {
+                const card = nodes[i];
+                const title = (card.querySelector('h1, h2, h3, h4, .title, .name, [class*="title"], [class*="name"]') || {}).textContent?.trim() || '';
+                const image = (card.querySelector('img') || {}).src || '';
+                if (!title && !image) continue;
+                items.push({
+                    title: title,
+                    description: (card.querySelector('p, .description, .desc, [class*="description"], [class*="desc"]') || {}).textContent?.trim() || '',
+                    image: image,
+                    link: (card.querySelector('a') || {}).href || '',
+                    className: card.className || '',
+                    price: (card.querySelector('.price, [class*="price"]') || {}).textContent?.trim() || ''
+                });
+            }
+            return items;
+        })(),
+
+        // Extract section dividers and separators
+        dividers: (() => {
+            const items = [];
+            const nodes = document.querySelectorAll('hr, .divider, .separator, [class*="divider"], [class*="separator"]');
+            for (let i = 0; i < nodes.length; i++) {
+                const div = nodes[i];
+                const computedStyle = cs(div);
+                items.push({
+                    tagName: div.tagName.toLowerCase(),
+                    className: div.className || '',
+                    style: div.style.cssText || '',
+                    computedStyle: {
+                        borderTop: computedStyle.borderTop,
+                        borderBottom: computedStyle.borderBottom,
+                        backgroundColor: computedStyle.backgroundColor,
+                        height: computedStyle.height,
+                        margin: computedStyle.margin
+                    }
+                });
+            }
+            return items;
+        })(),
+
+        // COMPREHENSIVE TEXT CONTENT EXTRACTION
+        textContent: {
+            // Extract all visible text elements with complete color information
+            allText: (() => {
+                const items = [];
+                const nodes = document.querySelectorAll('p, span, div, li, h1, h2, h3, h4, h5, h6, a, button, .text, .content, .description, .title, .subtitle, .caption, .label, .price, .product-name, .product-title');
+                for (let i = 0; i < nodes.length; i++) {
+                    const el = nodes[i];
+                    // Skip empty, overlong and hidden elements before any of the expensive work
+                    const text = textOf(el);
+                    if (!text || text.length >= 500) continue;
+                    const computedStyle = cs(el);
+                    if (computedStyle.display === 'none' || computedStyle.visibility === 'hidden' || computedStyle.opacity === '0') continue;
+
+                    // One ancestor walk (starting at el, like closest) for context, text role and semantic context
+                    let contextNode = null;
+                    let inNavigation = false, inNavOrHeader = false, inButton = false, inPrice = false;
+                    let inProductClass = false, inProductOrItem = false, inFooter = false, inHero = false, inCta = false;
+                    for (let node = el; node; node = node.parentElement) {
+                        const tag = node.tagName;
+                        const cls = node.classList;
+                        const classAttr = node.getAttribute('class') || '';
+                        if (!contextNode && (tag === 'SECTION' || tag === 'ARTICLE' || tag === 'NAV' || tag === 'HEADER' || tag === 'FOOTER' ||
+                            cls.contains('product') || cls.contains('card') || cls.contains('hero') || cls.contains('banner') || cls.contains('content'))) {
+                            contextNode = node;
+                        }
+                        if (tag === 'NAV' || tag === 'HEADER') inNavOrHeader = inNavigation = true;
+                        else if (cls.contains('navbar')) inNavigation = true;
+                        if (tag === 'BUTTON' || cls.contains('btn')) inButton = true;
+                        if (classAttr.includes('price')) inPrice = true;
+                        if (classAttr.includes('product')) inProductClass = true;
+                        if (cls.contains('product') || cls.contains('item')) inProductOrItem = true;
+                        if (tag === 'FOOTER') inFooter = true;
+                        if (cls.contains('hero') || cls.contains('banner')) inHero = true;
+                        if (cls.contains('cta') || cls.contains('call-to-action')) inCta = true;
+                    }
+
+                    // Text role classification
+                    let textRole = 'content';
+                    if (inNavigation) textRole = 'navigation';
+                    else if (inButton) textRole = 'button';
+                    else if (el.tagName.match(/H[1-6]/)) textRole = 'heading';
+                    else if (inPrice) textRole = 'price';
+                    else if (inProductClass) textRole = 'product';
+                    else if (inFooter) textRole = 'footer';
+
+                    // Semantic context
+                    const contexts = [];
+                    if (inHero) contexts.push('hero');
+                    if (inProductOrItem) contexts.push('product');
+                    if (inCta) contexts.push('cta');
+                    if (inNavOrHeader) contexts.push('navigation');
+                    if (inFooter) contexts.push('footer');
+
+                    // Parent background for context
+                    const parentBackgroundColor = el.parentElement ? cs(el.parentElement).backgroundColor : 'transparent';
+
+                    items.push({
+                        tagName: el.tagName.toLowerCase(),
+                        text: text,
+                        className: el.className || '',
+                        id: el.id || '',
+                        context: contextNode?.className || '',
+                        // Complete font and color information
+                        styles: {
+                            fontFamily: computedStyle.fontFamily,
+                            fontSize: computedStyle.fontSize,
+                            fontWeight: computedStyle.fontWeight,
+                            letterSpacing: computedStyle.letterSpacing,
+                            lineHeight: computedStyle.lineHeight,
+                            textAlign: computedStyle.textAlign,
+                            textDecoration: computedStyle.textDecoration,
+                            // Color information
+                            color: computedStyle.color,
+                            backgroundColor: computedStyle.backgroundColor,
+                            parentBackgroundColor: parentBackgroundColor,
+                            // Contrast context
+                            isOnDarkBackground: isColorDark(computedStyle.backgroundColor) || isColorDark(parentBackgroundColor),
+                            textRole: textRole,
+                            semanticContext: contexts.join(',') || 'general'
+                        },
+                        position: rectOf(el),
+                        isVisible: true
+                    });
+                }
+                return items;
+            })(),
+
+            // Extract comprehensive color palette from the website
+            colorPalette: Array.from(colorCounts.entries())
+                .sort((a, b) => b[1] - a[1])
+                .slice(0, 50)  // Top 50 colors by usage
+                .map(entry => entry[0]),
+
+            // Navigation-specific color extraction
+            navigationColors: (() => {
+                const items = [];
+                const navs = document.querySelectorAll('nav, header, .navbar, .navigation, .menu');
+                for (let i = 0; i < navs.length; i++) {
+                    const nav = navs[i];
+                    const computedStyle = cs(nav);
+                    const linkColors = [];
+                    const navLinks = nav.querySelectorAll('a');
+                    for (let j = 0; j < navLinks.length; j++) {
+                        const link = navLinks[j];
+                        linkColors.push({
+                            text: textOf(link),
+                            color: cs(link).color,
+                            hoverColor: link.getAttribute('data-hover-color') || 'inherit',
+                            className: link.className || ''
+                        });
+                    }
+                    items.push({
+                        element: nav.tagName.toLowerCase(),
+                        className: nav.className || '',
+                        backgroundColor: computedStyle.backgroundColor,
+                        textColor: computedStyle.color,
+                        linkColors: linkColors,
+                        borderColor: computedStyle.borderColor,
+                        boxShadow: computedStyle.boxShadow
+                    });
+                }
+                return items;
+            })(),
+
+            // Button-specific color extraction
+            buttonColors: (() => {
+                const items = [];
+                for (let i = 0; i < buttonEls.length; i++) {
+                    const btn = buttonEls[i];
+                    if (!btn.matches(BUTTON_COLORS_SELECTOR)) continue;
+                    const text = textOf(btn) || btn.value || '';
+                    if (!text) continue;
+                    const computedStyle = cs(btn);
+                    items.push({
+                        text: text,
+                        type: btn.tagName.toLowerCase(),
+                        className: btn.className || '',
+                        colors: {
+                            textColor: computedStyle.color,
+                            backgroundColor: computedStyle.backgroundColor,
+                            borderColor: computedStyle.borderColor,
+                            hoverTextColor: btn.getAttribute('data-hover-text-color') || computedStyle.color,
+                            hoverBackgroundColor: btn.getAttribute('data-hover-bg-color') || computedStyle.backgroundColor
+                        },
+                        styles: {
+                            padding: computedStyle.padding,
+                            borderRadius: computedStyle.borderRadius,
+                            fontSize: computedStyle.fontSize,
+                            fontWeight: computedStyle.fontWeight
+                        },
+                        context: buttonContextOf(btn)?.className || ''
+                    });
+                }
+                return items;
+            })(),
+
+            // Heading-specific color extraction
+            headingColors: (() => {
+                const items = [];
+                for (let i = 0; i < headingEls.length; i++) {
+                    const heading = headingEls[i];
+                    const text = textOf(heading);
+                    if (!text) continue;
+                    const computedStyle = cs(heading);
+                    items.push({
+                        level: parseInt(heading.tagName.substring(1)),
+                        text: text,
+                        className: heading.className || '',
+                        colors: {
+                            textColor: computedStyle.color,
+                            backgroundColor: computedStyle.backgroundColor
+                        },
+                        styles: {
+                            fontSize: computedStyle.fontSize,
+                            fontWeight: computedStyle.fontWeight,
+                            lineHeight: computedStyle.lineHeight,
+                            marginTop: computedStyle.marginTop,
+                            marginBottom: computedStyle.marginBottom
+                        },
+                        context: headingContextOf(heading)?.className || ''
+                    });
+                }
+                return items;
+            })(),
+
+            // Product names and descriptions
+            productContent: (() => {
+                const items = [];
+                const products = document.querySelectorAll('.product, .item, [class*="product"], [class*="item"]');
+                for (let i = 0; i < products.length; i++) {
+                    const product = products[i];
+                    const title = product.querySelector('h1, h2, h3, .title, .name, .product-name, .product-title')?.textContent?.trim() || '';
+                    const description = product.querySelector('p, .description, .desc, .summary, .details')?.textContent?.trim() || '';
+                    if (!title && !description) continue;
+                    items.push({
+                        title: title,
+                        description: description,
+                        price: product.querySelector('.price, .cost, [class*="price"], [class*="cost"]')?.textContent?.trim() || '',
+                        buttonText: textsOf(product, 'button, .btn, .button, a[class*="btn"]'),
+                        className: product.className || '',
+                        id: product.id || ''
+                    });
+                }
+                return items;
+            })(),
+
+            // Navigation and menu text
+            navigationText: (() => {
+                const items = [];
+                const links = document.querySelectorAll('nav a, header a, .menu a, .navbar a, .navigation a');
+                for (let i = 0; i < links.length; i++) {
+                    const link = links[i];
+                    const text = textOf(link);
+                    if (!text) continue;
+                    items.push({
+                        text: text,
+                        href: link.href || '',
+                        className: link.className || '',
+                        parentContext: navContextOf(link)?.className || ''
+                    });
+                }
+                return items;
+            })(),
+
+            // Hero/banner text content
+            heroContent: (() => {
+                const items = [];
+                const heroes = document.querySelectorAll('.hero, .banner, .jumbotron, [class*="hero"], [class*="banner"]');
+                for (let i = 0; i < heroes.length; i++) {
+                    const hero = heroes[i];
+                    const title = hero.querySelector('h1, h2, .title, .headline')?.textContent?.trim() || '';
+                    const subtitle = hero.querySelector('h3, h4, .subtitle, .subheading, p')?.textContent?.trim() || '';
+                    if (!title && !subtitle) continue;
+                    items.push({
+                        title: title,
+                        subtitle: subtitle,
+                        ctaText: textsOf(hero, 'button, .btn, .cta, a[class*="btn"]'),
+                        className: hero.className || ''
+                    });
+                }
+                return items;
+            })(),
+
+            // All button and CTA text
+            buttonTexts: (() => {
+                const items = [];
+                for (let i = 0; i < buttonEls.length; i++) {
+                    const btn = buttonEls[i];
+                    if (!btn.matches(BUTTON_TEXTS_SELECTOR)) continue;
+                    const text = textOf(btn) || btn.value || btn.alt || '';
+                    if (!text) continue;
+                    items.push({
+                        text: text,
+                        type: btn.tagName.toLowerCase(),
+                        className: btn.className || '',
+                        href: btn.href || '',
+                        context: buttonTextContextOf(btn)?.className || ''
+                    });
+                }
+                return items;
+            })(),
+
+            // Section headings and content
+            sectionContent: (() => {
+                const items = [];
+                const sections = document.querySelectorAll('section, article, .section, .content-section');
+                for (let i = 0; i < sections.length && items.length < MAX_SECTIONS; i++) {
+                    const section = sections[i];
+                    const heading = section.querySelector('h1, h2, h3, .title, .heading')?.textContent?.trim() || '';
+                    const content = section.querySelector('p, .description, .text, .content')?.textContent?.trim().substring(0, 200) || '';
+                    if (!heading && !content) continue;
+                    items.push({
+                        heading: heading,
+                        content: content,
+                        className: section.className || '',
+                        id: section.id || ''
+                    });
+                }
+                return items;
+            })(),
+
+            // Footer text
+            footerContent: (() => {
+                const items = [];
+                const footers = document.querySelectorAll('footer, .footer');
+                for (let i = 0; i < footers.length; i++) {
+                    const footer = footers[i];
+                    const links = [];
+                    const footerLinks = footer.querySelectorAll('a');
+                    for (let j = 0; j < footerLinks.length; j++) {
+                        const text = textOf(footerLinks[j]);
+                        if (text) links.push(text);
+                    }
+                    // Wrappers around other p/span/div only concatenate text their descendants
+                    // contribute themselves; skip them instead of building the long string
+                    const text = [];
+                    const blocks = footer.querySelectorAll('p, span, div');
+                    for (let j = 0; j < blocks.length; j++) {
+                        const el = blocks[j];
+                        if (el.firstElementChild && el.querySelector('p, span, div')) continue;
+                        const t = el.textContent?.trim();
+                        if (t && t.length < 100) text.push(t);
+                    }
+                    if (links.length > 0 || text.length > 0) {
+                        items.push({
+                            links: links,
+                            text: text,
+                            className: footer.className || ''
+                        });
+                    }
+                }
+                return items;
+            })()
+        },
+
+        // Extract images with their attributes
+        images: (() => {
+            const items = [];
+            const seenSrc = new Set();
+            for (let i = 0; i < imageEls.length && items.length < MAX_IMAGES; i++) {
+                const img = imageEls[i];
+                const src = img.src;
+                if (!src || src.startsWith('data:') || seenSrc.has(src)) continue;
+                // Loaded icons and tracking pixels; unloaded (lazy) images report 0 and are kept
+                if (img.complete && img.naturalWidth > 0 && img.naturalWidth < MIN_IMAGE_SIZE && img.naturalHeight < MIN_IMAGE_SIZE) continue;
+                seenSrc.add(src);
+                items.push({
+                    src: src,
+                    alt: img.alt || '',
+                    width: img.width || img.naturalWidth || '',
+                    height: img.height || img.naturalHeight || '',
+                    className: img.className || '',
+                    id: img.id || '',
+                    loading: img.loading || '',
+                    srcset: img.srcset || '',
+                    sizes: img.sizes || '',
+                    title: img.title || '',
+                    style: img.style.cssText || ''
+                });
+            }
+            return items;
+        })(),
+
+        // Background images found during the element walk
+        backgroundImages: backgroundImages,
+
+        // Extract logo and brand images with enhanced Apple-specific detection
+        logoImages: (() => {
+            // Same matches as 'img[alt*="logo" i], img[class*="logo" i], img[id*="logo" i], .logo img,
+            // .brand img, header img, nav img, .globalnav img, img[src*="apple"], img[alt*="apple" i]',
+            // checked directly on the image bucket instead of through the selector engine
+            const items = [];
+            for (let i = 0; i < imageEls.length; i++) {
+                const img = imageEls[i];
+                const src = img.src;
+                const hasValidSrc = src && !src.startsWith('data:') && src.length > 10;
+                if (!hasValidSrc) continue;
+                const altAttr = (img.getAttribute('alt') || '').toLowerCase();
+                const isLogo = altAttr.includes('logo') || altAttr.includes('apple') ||
+                    (img.getAttribute('class') || '').toLowerCase().includes('logo') ||
+                    (img.getAttribute('id') || '').toLowerCase().includes('logo') ||
+                    (img.getAttribute('src') || '').includes('apple') ||
+                    (img.parentElement && logoContainerOf(img.parentElement));
+                if (!isLogo) continue;
+                items.push({
+                    src: src,
+                    alt: img.alt || '',
+                    className: img.className || '',
+                    id: img.id || '',
+                    width: img.width || img.naturalWidth || '',
+                    height: img.height || img.naturalHeight || '',
+                    parentElement: img.parentElement?.tagName.toLowerCase() || '',
+                    parentClass: img.parentElement?.className || '',
+                    // Enhanced Apple logo detection
+                    isAppleLogo: img.alt.toLowerCase().includes('apple') || src.includes('apple') || img.className.includes('apple'),
+                    hasValidSrc: hasValidSrc,
+                    naturalDimensions: {
+                        width: img.naturalWidth || 0,
+                        height: img.naturalHeight || 0
+                    }
+                });
+            }
+            return items;
+        })(),
+
+        // Extract fonts and typography information with Apple-specific detection
+        fonts: {
+            bodyFont: bodyStyle.fontFamily,
+            headingFonts: headingEls.map(h => {
+                const style = cs(h);
+                return {
+                    tag: h.tagName.toLowerCase(),
+                    fontFamily: style.fontFamily,
+                    fontSize: style.fontSize,
+                    fontWeight: style.fontWeight,
+                    color: style.color,
+                    letterSpacing: style.letterSpacing,
+                    lineHeight: style.lineHeight,
+                    textContent: textOf(h).substring(0, 50)
+                };
+            }),
+            navigationFonts: globalNavAnchors.map(a => {
+                const style = cs(a);
+                return {
+                    fontFamily: style.fontFamily,
+                    fontSize: style.fontSize,
+                    fontWeight: style.fontWeight,
+                    color: style.color,
+                    letterSpacing: style.letterSpacing,
+                    lineHeight: style.lineHeight,
+                    textContent: textOf(a)
+                };
+            }),
+            primaryFonts: Array.from(fontFamilies).slice(0, 10),
+            // Detect Apple system fonts: each distinct family from the element walk is checked once
+            hasAppleFonts: (() => {
+                for (const family of fontFamilies) {
+                    const font = family.toLowerCase();
+                    if (font.includes('sf pro') || font.includes('-apple-system') || font.includes('helvetica neue')) return true;
+                }
+                return false;
+            })()
+        },
+
+        // Extract interactive buttons and CTAs with enhanced styling
+        buttons: (() => {
+            const items = [];
+            for (let i = 0; i < buttonEls.length && items.length < MAX_BUTTONS; i++) {
+                const btn = buttonEls[i];
+                const ownText = textOf(btn);
+                const text = ownText || btn.value || btn.alt || '';
+                const href = btn.href || '';
+                if (!text && !href) continue;
+                const lowerText = ownText.toLowerCase();
+                items.push(compact({
+                    tagName: btn.tagName.toLowerCase(),
+                    text: text,
+                    className: btn.className || '',
+                    id: btn.id || '',
+                    href: href,
+                    type: btn.type || '',
+                    ariaLabel: btn.getAttribute('aria-label') || '',
+                    style: pickStyles(btn, BUTTON_STYLE_PROPS),
+                    isClickable: btn.onclick !== null || btn.href || btn.type === 'button' || btn.type === 'submit',
+                    parentContext: parentContextOf(btn)?.className || '',
+                    isAppleStyle: lowerText.includes('learn more') || lowerText.includes('buy') ||
+                                 MORE_OR_CTA_CLASS_RE.test(btn.className)
+                }));
+            }
+            return items;
+        })(),
+
+        // Extract call-to-action elements and links with Apple patterns
+        ctaElements: (() => {
+            const items = [];
+            for (let i = 0; i < anchorEls.length; i++) {
+                const cta = anchorEls[i];
+                const text = textOf(cta);
+                const lowerText = text.toLowerCase();
+                if (!CTA_TEXT_RE.test(lowerText)) continue;
+                items.push(compact({
+                    text: text,
+                    href: cta.href,
+                    className: cta.className || '',
+                    id: cta.id || '',
+                    ariaLabel: cta.getAttribute('aria-label') || '',
+                    style: pickStyles(cta, CTA_STYLE_PROPS),
+                    parentContext: parentContextOf(cta)?.className || '',
+                    hasIcon: !!cta.querySelector('svg, i, .icon, [class*="icon"]'),
+                    isAppleButton: lowerText === 'learn more >' || lowerText === 'buy' ||
+                                  MORE_OR_BUTTON_CLASS_RE.test(cta.className)
+                }));
+            }
+            return items;
+        })(),
+
+        colors: Array.from(textColors),
+
+        viewport: {
+            width: window.innerWidth,
+            height: window.innerHeight,
+            documentHeight: document.documentElement.scrollHeight,
+            documentWidth: document.documentElement.scrollWidth
+        }
+    };
+    // One native JSON string crosses the CDP bridge instead of a per-property object graph
+    return JSON.stringify(data);
+}
+"""